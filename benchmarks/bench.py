@@ -0,0 +1,203 @@
+"""
+Times parsing, single strings and bulk generation of the package and of the older
+generator_0.2.py, generator_0.3.py and generator_0.4.py on a fixed corpus of regexes,
+and writes the results as JSON
+
+    python benchmarks/bench.py -o results.json
+    python benchmarks/bench.py --baseline results.json
+
+The older versions have no separate parse step and no bulk generation, their parse time is null
+and their bulk time is one generate call per string. Every result also has the share of
+strings which match the regex according to re, the older versions get some regexes wrong.
+Results of the package have the bytes of the compiled pattern as well
+"""
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generator import Generator
+
+# (name, regex) of every benchmarked regex
+CORPUS = [
+    ("literal", "hello world, this is a literal"),
+    ("escaped literal", "a\\.b\\.c\\-d\\+e"),
+    ("heavy bracket", "[A-Za-z0-9_.+\\-!#$%&'*/=?^`{|}~]{32}"),
+    ("many brackets", "[A-Z][a-z][0-9][a-f][A-F][xyz][0-7][,;:][A-Z][a-z][0-9][a-f]"),
+    ("negated bracket", "[^aeiou\\s]{20}"),
+    ("negated escapes", "\\D\\W\\S\\D\\W\\S"),
+    ("nested groups", "((ab|cd)(ef|gh)){5}"),
+    ("deep nesting", "(((((a|b)c)d)e)f){3}"),
+    ("alternation", "(GET|POST|PUT|DELETE|PATCH|HEAD|OPTIONS) /api/v\\d/(users|orders|items)"),
+    ("large repeat", "x{500,1000}"),
+    ("large class repeat", "\\w{200,400}"),
+    ("star and plus", "[a-z]+@[a-z]+\\.com"),
+    ("identifier", "[A-Z]{3}\\d{6}"),
+]
+
+# the older versions next to the package, by version name
+LEGACY = {
+    "0.2" : "generator_0.2.py",
+    "0.3" : "generator_0.3.py",
+    "0.4" : "generator_0.4.py",
+}
+
+
+def load_legacy(version):
+    """
+    Returns the module of an older version, loaded from its file
+    """
+    path = os.path.join(ROOT, LEGACY[version])
+    spec = importlib.util.spec_from_file_location("generator_" + version.replace(".", "_"), path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_time(function, repeat):
+    """
+    Returns the fastest of repeat runs of the function in seconds, and the result of the last run
+    """
+    best = None
+    result = None
+    for run in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def match_share(regex_string, strings):
+    """
+    Returns the share of the strings which fully match the regex
+    """
+    if len(strings) == 0:
+        return None
+    compiled = re.compile(regex_string)
+    return sum(1 for string in strings if compiled.fullmatch(string) is not None) / len(strings)
+
+
+def bench_package(regex_string, amount, repeat, max_repeat, seed):
+    """
+    Returns the parse, single and bulk times of the package for one regex.
+    Single strings come from generate, which compiles the regex once and then takes it from the cache
+    """
+    generator = Generator(max_repeat, seed=seed)
+    parse, _ = best_time(lambda: generator.build(regex_string), repeat)
+    single, _ = best_time(lambda: [generator.generate(regex_string) for index in range(amount)], repeat)
+    compiled = generator.compile(regex_string)
+    bulk, strings = best_time(lambda: compiled.generate_many(amount), repeat)
+    return parse, single, bulk, strings
+
+
+def bench_legacy(module, regex_string, amount, repeat, max_repeat):
+    """
+    Returns the times of an older version for one regex. Single strings each come from a new
+    instance, as these versions were used. They keep the generated string in the instance,
+    so for bulk generation one instance is reset before every call
+    """
+    single, _ = best_time(lambda: [module.Generator(max_repeat).generate(regex_string) for index in range(amount)], repeat)
+    generator = module.Generator(max_repeat)
+
+    def generate():
+        generator.result = ""
+        return generator.generate(regex_string)
+
+    bulk, strings = best_time(lambda: [generate() for index in range(amount)], repeat)
+    return None, single, bulk, strings
+
+
+def run(versions, amount, repeat, max_repeat, seed):
+    """
+    Returns the result of every version and regex of the corpus as a list of dicts
+    """
+    results = []
+    for version in versions:
+        module = None if version == "package" else load_legacy(version)
+        for name, regex_string in CORPUS:
+            random.seed(seed)
+            result = {"Version" : version, "Name" : name, "Pattern" : regex_string, "Parse" : None,
+                      "Single" : None, "Bulk" : None, "Matches" : None, "Bytes" : None, "Error" : None}
+            try:
+                # the older versions print while they generate
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                    if module is None:
+                        parse, single, bulk, strings = bench_package(regex_string, amount, repeat, max_repeat, seed)
+                    else:
+                        parse, single, bulk, strings = bench_legacy(module, regex_string, amount, repeat, max_repeat)
+            except Exception as error:
+                result["Error"] = "{}: {}".format(type(error).__name__, error)
+            else:
+                result.update({"Parse" : parse, "Single" : single / amount, "Bulk" : bulk / amount,
+                               "Matches" : match_share(regex_string, strings)})
+                if module is None:
+                    result["Bytes"] = Generator(max_repeat).compile(regex_string).sizeof()["Total"]
+            results.append(result)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints every time which got slower than threshold times its time in the baseline to stderr.
+    Returns the amount of those regressions
+    """
+    before = {(result["Version"], result["Name"]) : result for result in baseline["Results"]}
+    regressions = 0
+    for result in results:
+        old = before.get((result["Version"], result["Name"]))
+        if old is None:
+            continue
+        for key in ["Parse", "Single", "Bulk"]:
+            if result[key] is None or old[key] is None or old[key] == 0:
+                continue
+            ratio = result[key] / old[key]
+            if ratio > threshold:
+                regressions += 1
+                print("{} {} {}: {:.3g}s against {:.3g}s ({:.2f}x)".format(
+                    result["Version"], result["Name"], key, result[key], old[key], ratio), file=sys.stderr)
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the generator against its older versions")
+    parser.add_argument("-o", "--output", help="file to write the JSON results to instead of stdout")
+    parser.add_argument("-n", "--amount", type=int, default=1000, help="amount of strings per regex and run (default 1000)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="amount of runs, the fastest one counts (default 3)")
+    parser.add_argument("--max-repeat", type=int, default=100, help="maximum amount of repeats for *, + and {x,} (default 100)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated strings (default 0)")
+    parser.add_argument("--versions", nargs="+", default=["package"] + list(LEGACY), choices=["package"] + list(LEGACY),
+                        help="versions to benchmark (default all)")
+    parser.add_argument("--baseline", help="JSON results of an earlier run, every time slower than --threshold times its old time is reported")
+    parser.add_argument("--threshold", type=float, default=1.5, help="slowdown reported against the baseline (default 1.5)")
+    args = parser.parse_args(arguments)
+
+    results = run(args.versions, max(1, args.amount), max(1, args.repeat), args.max_repeat, args.seed)
+    report = {"Python" : platform.python_version(), "Platform" : platform.platform(), "Amount" : args.amount,
+              "Repeat" : args.repeat, "Seed" : args.seed, "Results" : results}
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if compare(results, baseline, args.threshold) > 0:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
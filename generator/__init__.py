@@ -0,0 +1,17 @@
+"""
+Generates strings based on a regex
+
+    from generator import Generator
+    Generator(100).generate('[A-Z]{3}\\d{6}')
+
+Running the package (python -m generator) asks for a regex interactively
+"""
+from .cache import PatternCache
+from .charset import CharSet
+from .compiled import CompiledPattern
+from .generator import Generator
+from .parallel import ParallelGenerator
+from .profile import Profile
+from .store import PatternStore
+
+__all__ = ["CharSet", "CompiledPattern", "Generator", "ParallelGenerator", "PatternCache", "Profile", "PatternStore"]
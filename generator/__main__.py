@@ -0,0 +1,148 @@
+import argparse
+import os
+import sys
+
+from .generator import Generator
+from .parallel import ParallelGenerator
+
+# size of the write buffer of the output file
+BUFFER_SIZE = 1 << 20
+
+
+def interactive(generator):
+    """
+    Keeps asking for a regex and prints a string generated from it,
+    until an empty line or the end of the input. A bad regex is reported and asked again
+    """
+    while True:
+        print("From what regex would you like the string to be generated?")
+        try:
+            regex_string = input()
+        except EOFError:
+            break
+        if regex_string == "":
+            break
+        try:
+            result = generator.generate(regex_string)
+        except ValueError as error:
+            print("This regex can not be used: {}".format(error))
+            continue
+        print("The result is: {}".format(result))
+
+
+def read_patterns(path):
+    """
+    Returns the patterns in the file, one per line. Empty lines are skipped
+    """
+    with open(path, encoding="utf-8") as pattern_file:
+        return [line.rstrip("\r\n") for line in pattern_file if line.rstrip("\r\n") != ""]
+
+
+def iter_batches(compiled, amount, batch_size):
+    """
+    Yields the amount strings of the compiled pattern in batches of batch_size
+    """
+    remaining = amount
+    while remaining > 0:
+        batch = compiled.generate_many(min(batch_size, remaining))
+        remaining -= len(batch)
+        yield batch
+
+
+def stream(batches, output, separator):
+    """
+    Writes every string of the batches to the binary output, each followed by the separator.
+    Strings are written per batch, so memory does not grow with the amount of strings
+    """
+    for batch in batches:
+        batch.append("")
+        output.write(separator.join(batch).encode("utf-8", "surrogatepass"))
+
+
+def report_verification(verify_stats):
+    """
+    Prints the verification counters of every regex to stderr
+    """
+    for regex_string, stats in verify_stats.items():
+        print("{}: {} checked, {} mismatches ({:.2%}), {:.3f}s verifying".format(
+            regex_string, stats["Checked"], stats["Mismatches"], stats["Mismatches"] / max(1, stats["Checked"]), stats["Time"]), file=sys.stderr)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m generator", description="Generates strings based on a regex")
+    parser.add_argument("patterns", nargs="*", help="regexes to generate strings from, without any the regex is asked for interactively")
+    parser.add_argument("-f", "--file", help="file with one regex per line")
+    parser.add_argument("-n", "--count", type=int, default=1, help="amount of strings per regex (default 1)")
+    parser.add_argument("-o", "--output", help="file to write to instead of stdout")
+    parser.add_argument("-0", "--null", action="store_true", help="end every string with NUL instead of a new line")
+    parser.add_argument("--max-repeat", type=int, default=100, help="maximum amount of repeats for *, + and {x,} (default 100)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="amount of strings generated per write (default 10000)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="amount of worker processes (default 1)")
+    parser.add_argument("--seed", type=int, help="master seed, the output is the same for the same seed and batch size whatever the amount of workers")
+    parser.add_argument("--verify", action="store_true", help="check every string with re and generate it again if it does not match")
+    parser.add_argument("--store", help="file of compiled patterns, loaded if it exists and else saved with the patterns of this run")
+    parser.add_argument("--profile", action="store_true", help="print the calls, time, characters and random draws of every node of every regex to stderr")
+    args = parser.parse_args(arguments)
+    if args.profile and args.workers > 1:
+        parser.error("--profile counts in this process, it can not be combined with --workers")
+
+    generator = Generator(args.max_repeat, verify=args.verify)
+    store = None
+    if args.store is not None and os.path.exists(args.store):
+        try:
+            generator.load_store(args.store)
+        except ValueError as error:
+            parser.error(str(error))
+        store = args.store
+    patterns = list(args.patterns)
+    if args.file is not None:
+        patterns += read_patterns(args.file)
+    if len(patterns) == 0:
+        interactive(generator)
+        return 0
+
+    separator = "\0" if args.null else "\n"
+    if args.output is None:
+        output = sys.stdout.buffer
+    else:
+        output = open(args.output, "wb", buffering=BUFFER_SIZE)
+    batch_size = max(1, args.batch_size)
+    parallel = None
+    if args.workers > 1 or args.seed is not None:
+        parallel = ParallelGenerator(args.max_repeat, workers=args.workers, seed=args.seed, chunk_size=batch_size, verify=args.verify, store=store)
+    try:
+        for pattern in patterns:
+            try:
+                if parallel is not None:
+                    batches = parallel.iter_chunks(pattern, args.count)
+                else:
+                    batches = iter_batches(generator.compile(pattern), args.count, batch_size)
+                if args.profile:
+                    # the batches are generated lazily, so they are all profiled
+                    compiled = generator.compile(pattern) if parallel is None else parallel.compile(pattern)
+                    compiled.start_profile()
+                stream(batches, output, separator)
+            except ValueError as error:
+                # a regex which can not be parsed or generated, like an unbalanced parenthesis
+                parser.error("{}: {}".format(pattern, error))
+            if args.profile:
+                print("{}:\n{}".format(pattern, compiled.stop_profile().format()), file=sys.stderr)
+        output.flush()
+        report_verification(generator.verify_stats if parallel is None else parallel.verify_stats)
+        if args.store is not None and generator.store is None:
+            generator.save_store(args.store, patterns)
+    except BrokenPipeError:
+        # the reader went away, for example when piped into head.
+        # Point stdout at devnull so the flush at exit does not fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        if parallel is not None:
+            parallel.close()
+        if output is not sys.stdout.buffer:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import collections
+import threading
+
+
+class PatternCache:
+    """
+    A bounded cache of compiled patterns which drops the least recently used pattern
+    once it holds size patterns. A size of 0 keeps nothing.
+    It keeps other values the same way, like the character sets of bracket lists.
+
+    Every lookup and insert holds a lock, so one cache can be shared between threads.
+    Compiling itself happens outside of the lock, two threads missing the same
+    pattern at once both compile it and the last one is kept
+    """
+
+    def __init__(self, size=256) -> None:
+        self.size = size
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+
+    def get(self, key):
+        """
+        Returns the pattern stored for the key and marks it as most recently used, or None
+        """
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+
+    def put(self, key, value):
+        """
+        Stores the pattern for the key, dropping the least recently used ones above size
+        """
+        with self.lock:
+            if self.size <= 0:
+                return
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+    def clear(self):
+        """
+        Drops every pattern, the counters are kept
+        """
+        with self.lock:
+            self.entries.clear()
+
+
+    def stats(self):
+        """
+        Returns the counters of the cache as a dict with "Hits", "Misses", "Size" and "Capacity"
+        """
+        with self.lock:
+            return {"Hits" : self.hits, "Misses" : self.misses, "Size" : len(self.entries), "Capacity" : self.size}
+
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,244 @@
+import bisect
+import functools
+import random
+import string
+
+
+class CharSet:
+    """
+    A set of characters stored as sorted, non overlapping ranges of code points.
+    A random character is picked by drawing a rank and looking up the range it falls in
+    through the cumulative widths of the ranges, so wide ranges like [\u0000-\uffff]
+    are never expanded into their characters
+    """
+
+    # sets up to this many characters also keep their characters as a string for faster sampling
+    SMALL_SET = 1024
+
+    __slots__ = ("ranges", "offsets", "size", "firsts", "_chars")
+
+    def __init__(self, ranges=()) -> None:
+        self.ranges = normalize_ranges(ranges)
+        offsets = []
+        size = 0
+        for first, last in self.ranges:
+            offsets.append(size)
+            size += last - first + 1
+        # tuples, which take less memory than lists and are shared by every pattern using the set
+        self.offsets = tuple(offsets)
+        self.size = size
+        self.firsts = tuple(first for first, last in self.ranges)
+        self._chars = None
+
+
+    @classmethod
+    def from_chars(cls, chars):
+        """
+        Builds the set of all characters in chars
+        """
+        return cls([(ord(char), ord(char)) for char in chars])
+
+
+    @classmethod
+    def from_range(cls, first, last):
+        """
+        Builds the set of all characters between and including first and last
+        """
+        if ord(last) < ord(first):
+            raise ValueError("bad character range {}-{}".format(first, last))
+        return cls([(ord(first), ord(last))])
+
+
+    @property
+    def chars(self):
+        """
+        The characters of the set as a string in code point order.
+        Only small sets keep this string, for large sets it is built on every use
+        """
+        if self._chars is not None:
+            return self._chars
+        chars = "".join([chr(code) for first, last in self.ranges for code in range(first, last + 1)])
+        if self.size <= self.SMALL_SET:
+            self._chars = chars
+        return chars
+
+
+    def union(self, other):
+        """
+        Returns the set of characters which are in either set
+        """
+        return CharSet(self.ranges + other.ranges)
+
+
+    def intersection(self, other):
+        """
+        Returns the set of characters which are in both sets
+        """
+        # the complement against other is other without self, taking that from other leaves the overlap
+        return self.complement(other).complement(other)
+
+
+    def difference(self, other):
+        """
+        Returns the set of characters which are in this set but not in other
+        """
+        return other.complement(self)
+
+
+    def complement(self, universe=None):
+        """
+        Returns the characters of the universe which are not in this set.
+        Without a universe, ALL_CHARS is used
+        """
+        if universe is None:
+            universe = UNIVERSE
+        ranges = []
+        index = 0
+        for first, last in universe.ranges:
+            # skip the ranges of this set which end before the universe range
+            while index < len(self.ranges) and self.ranges[index][1] < first:
+                index += 1
+            position = index
+            while first <= last:
+                if position == len(self.ranges) or self.ranges[position][0] > last:
+                    ranges.append((first, last))
+                    break
+                excluded_first, excluded_last = self.ranges[position]
+                if excluded_first > first:
+                    ranges.append((first, excluded_first - 1))
+                first = excluded_last + 1
+                position += 1
+        return CharSet(ranges)
+
+
+    def choice(self, rng=random):
+        """
+        Returns one random character of the set
+        """
+        if self.size <= self.SMALL_SET:
+            return rng.choice(self.chars)
+        return self[rng.randrange(self.size)]
+
+
+    def choices(self, amount, rng=random):
+        """
+        Returns a list of amount random characters of the set
+        """
+        if self.size <= self.SMALL_SET:
+            return rng.choices(self.chars, k=amount)
+        size = self.size
+        randrange = rng.randrange
+        return [self[randrange(size)] for i in range(amount)]
+
+
+    def index(self, char):
+        """
+        Returns the rank of the character in the set, the inverse of indexing the set
+        """
+        code = ord(char)
+        index = bisect.bisect_right(self.firsts, code) - 1
+        if index < 0 or code > self.ranges[index][1]:
+            raise ValueError("{!r} is not in the set".format(char))
+        return self.offsets[index] + code - self.ranges[index][0]
+
+
+    def __or__(self, other):
+        return self.union(other)
+
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __getitem__(self, rank):
+        if rank < 0:
+            rank += self.size
+        if rank < 0 or rank >= self.size:
+            raise IndexError("CharSet index out of range")
+        index = bisect.bisect_right(self.offsets, rank) - 1
+        return chr(self.ranges[index][0] + rank - self.offsets[index])
+
+
+    def __iter__(self):
+        for first, last in self.ranges:
+            for code in range(first, last + 1):
+                yield chr(code)
+
+
+    def __contains__(self, char):
+        if len(char) != 1:
+            return False
+        code = ord(char)
+        index = bisect.bisect_right(self.firsts, code) - 1
+        return index >= 0 and code <= self.ranges[index][1]
+
+
+    def __eq__(self, other):
+        return isinstance(other, CharSet) and self.ranges == other.ranges
+
+
+    def __hash__(self):
+        return hash(self.ranges)
+
+
+    def __repr__(self):
+        if self.size <= self.SMALL_SET:
+            return "CharSet({!r})".format(self.chars)
+        return "CharSet(ranges={!r})".format(self.ranges)
+
+
+def normalize_ranges(ranges):
+    """
+    Sorts the (first, last) code point ranges and merges the ones which overlap or touch
+    """
+    merged = []
+    for first, last in sorted(ranges):
+        if len(merged) > 0 and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1] = (merged[-1][0], last)
+        else:
+            merged.append((first, last))
+    return tuple(merged)
+
+
+# Every character a negative bracket list can choose from
+ALL_CHARS = string.ascii_lowercase + string.ascii_uppercase + string.digits + string.whitespace + string.punctuation
+UNIVERSE = CharSet.from_chars(ALL_CHARS)
+
+# Precomputed character sets for the metacharacters, these are shared by every pattern
+DIGITS = CharSet.from_chars(string.digits)
+WORD = CharSet.from_chars(string.ascii_letters + string.digits + '_')
+WHITESPACE = CharSet.from_chars(string.whitespace)
+NEWLINE = CharSet.from_chars('\n')
+
+# Universes whose class tables are kept, the least recently used one is dropped beyond that
+CLASS_TABLES_SIZE = 64
+
+
+@functools.lru_cache(maxsize=CLASS_TABLES_SIZE)
+def class_tables(universe):
+    """
+    Returns the character sets of the escapes \d, \D, \w, \W, \s and \S by their letter,
+    together with the set of the . metacharacter, any character except new line.
+    The negative ones are taken from the universe, like a negative bracket list
+    """
+    tables = {
+        'd' : DIGITS,
+        'D' : DIGITS.complement(universe),
+        'w' : WORD,
+        'W' : WORD.complement(universe),
+        's' : WHITESPACE,
+        'S' : WHITESPACE.complement(universe),
+    }
+    return tables, NEWLINE.complement(universe)
+
+
+CLASS_TABLES, ANY_CHAR = class_tables(UNIVERSE)
@@ -0,0 +1,736 @@
+import bisect
+import fractions
+import itertools
+import math
+import sys
+import time
+
+from .cache import PatternCache
+from .language import count_nodes, cumulative_counts, length_tables, max_length, may_be_ambiguous, rank, unrank
+from .lookaround import call, satisfy
+from .nodes import Backreference, Capture, CaptureEnd, Choice, CharClass, Literal, Lookaround, Repeat, Sequence, children, postorder
+from .charset import CharSet
+from .permutation import Permutation
+from .profile import CountingRandom, Profile
+
+# Steps on the work stack of CompiledPattern.emit_many
+VISIT = 0
+JOIN_SEQUENCE = 1
+JOIN_FIXED_REPEAT = 2
+JOIN_REPEAT = 3
+SCATTER = 4
+
+# Strings of a pattern with lookarounds which are drawn before giving up
+LOOKAROUND_ATTEMPTS = 100
+
+# Strings drawn again for one string which does not pass verification, before giving up
+VERIFY_ATTEMPTS = 100
+
+# Strings of a pattern with backreferences which are drawn before giving up. A draw fails
+# when a backreference refers to a group which took no part in it, like the \1 of (a)?\1
+BACKREFERENCE_ATTEMPTS = 100
+
+# Length tables of different max_len which a pattern keeps, see generate_with_length
+LENGTH_TABLES = 8
+
+# Indexes in a row which iter_unique skips as another way to generate a string given out, before giving up
+UNIQUE_SKIPS = 10000
+
+
+class CompiledPattern:
+    """
+    A regex which has been parsed into a tree of nodes by Generator.compile.
+    Generating only walks this tree, the regex text is not parsed again.
+    """
+
+    def __init__(self, generator, pattern, tree, uniform=False, verifier=None) -> None:
+        self.generator = generator
+        self.pattern = pattern
+        self.tree = tree
+        self.uniform = uniform
+        # the pattern compiled with re, which every generated string is checked against, or None
+        self.verifier = verifier
+        self.stats = None
+        if verifier is not None:
+            self.stats = generator.verify_stats.setdefault(pattern, {"Checked" : 0, "Mismatches" : 0, "Time" : 0.0})
+        # amount of strings every node can generate, by id of the node, counted on first use
+        self.counts = None
+        # cumulative counts of the branches and repeat amounts, by id of the node, built on first use
+        self.tables = None
+        # length tables of the tree, by the longest length they cover. They depend on the weights
+        self.length_cache = PatternCache(LENGTH_TABLES)
+        # a pattern with lookarounds is generated one string at a time, see generate_constrained
+        nodes = postorder(tree)
+        self.lookarounds = [node for node in nodes if type(node) is Lookaround]
+        # a pattern with backreferences is generated one string at a time as well
+        self.backreferences = [node for node in nodes if type(node) is Backreference]
+        self.bind_rng(generator.rng)
+        # counters of the nodes while profiling, see start_profile
+        self.profile = None
+        if uniform:
+            self.set_uniform_weights()
+
+
+    def generate(self, min_len=None, max_len=None):
+        """
+        Returns one string generated from the compiled tree.
+        With min_len and/or max_len only strings of a length in between (including) are generated
+        """
+        if self.verifier is not None:
+            return self.verify([self.draw(min_len, max_len)], min_len, max_len)[0]
+        return self.draw(min_len, max_len)
+
+
+    def draw(self, min_len=None, max_len=None):
+        """
+        Returns one string generated from the compiled tree, without verification
+        """
+        if min_len is not None or max_len is not None:
+            return self.generate_with_length(min_len, max_len)
+        if self.lookarounds:
+            return self.generate_constrained()
+        for attempt in range(BACKREFERENCE_ATTEMPTS):
+            buffer = []
+            if self.emit(self.tree, buffer):
+                return "".join(buffer)
+        raise ValueError("could not generate a string whose backreferences all refer to groups which matched")
+
+
+    def generate_many(self, amount, min_len=None, max_len=None):
+        """
+        Returns a list of amount strings generated from the compiled tree.
+        The whole batch is built node by node, so the random numbers for a node
+        are drawn in bulk for all strings at once instead of one call per character
+        """
+        if min_len is not None or max_len is not None or self.lookarounds or self.backreferences:
+            strings = [self.draw(min_len, max_len) for i in range(amount)]
+        else:
+            strings = self.emit_many(self.tree, amount)
+        if self.verifier is not None:
+            return self.verify(strings, min_len, max_len)
+        return strings
+
+
+    def verify(self, strings, min_len, max_len):
+        """
+        Checks every string with re and draws strings again in place of the ones which do not match.
+        Every check and every mismatch is counted in the stats, together with the time spent here
+        """
+        start = time.perf_counter()
+        fullmatch = self.verifier.fullmatch
+        checked = len(strings)
+        mismatches = 0
+        try:
+            for index, string in enumerate(strings):
+                attempts = 0
+                while fullmatch(string) is None:
+                    mismatches += 1
+                    attempts += 1
+                    if attempts > VERIFY_ATTEMPTS:
+                        raise ValueError("could not generate a string which matches {!r} in {} attempts".format(self.pattern, VERIFY_ATTEMPTS))
+                    string = self.draw(min_len, max_len)
+                    checked += 1
+                strings[index] = string
+        finally:
+            self.stats["Checked"] += checked
+            self.stats["Mismatches"] += mismatches
+            self.stats["Time"] += time.perf_counter() - start
+        return strings
+
+
+    def generate_with_length(self, min_len, max_len):
+        """
+        Returns one string with a length between min_len and max_len.
+        The length is drawn first, weighted by how likely generate is to give a string of that
+        length (see length_tables), then every choice, repeat amount and part of a sequence is
+        drawn the same way among the ones which reach that length. So a string comes out as
+        often as it would from generate when only the strings in the range are kept, weights set
+        with set_weights or uniform included, and no string is ever thrown away
+        """
+        if self.lookarounds or self.backreferences:
+            raise ValueError("min_len and max_len can not be used with lookarounds or backreferences")
+        if max_len is None:
+            max_len = max_length(self.tree)
+        if min_len is None:
+            min_len = 0
+        weights, factors, repeats, tails = self.get_length_tables(max_len)
+        root_weights = weights[id(self.tree)]
+        feasible = sorted(length for length in root_weights if length >= min_len)
+        if len(feasible) == 0:
+            raise ValueError("the pattern can not generate a string of length {} up to {}".format(min_len, max_len))
+        rng = self.rng
+        pick_weighted = self.pick_weighted
+        buffer = []
+        stack = [(self.tree, feasible[pick_weighted([root_weights[length] for length in feasible])])]
+        while stack:
+            node, length = stack.pop()
+            node_type = type(node)
+            if node_type is Literal:
+                buffer.append(node.text)
+            elif node_type is CharClass:
+                buffer.append(node.charset.choice(rng))
+            elif node_type is Choice:
+                branch = pick_weighted([factor * weights[id(branch)].get(length, 0) for factor, branch in zip(factors[id(node)], node.branches)])
+                stack.append((node.branches[branch], length))
+            elif node_type is Sequence:
+                tail = tails[id(node)]
+                parts = []
+                for index, child in enumerate(node.nodes):
+                    child_length = self.split_length(weights[id(child)], tail[index + 1], length)
+                    parts.append((child, child_length))
+                    length -= child_length
+                stack.extend(reversed(parts))
+            elif node_type is Repeat:
+                copies = repeats[id(node)]
+                repeat = node.min_value + pick_weighted([factor * copies[node.min_value + index].get(length, 0) for index, factor in enumerate(factors[id(node)])])
+                child_weights = weights[id(node.node)]
+                parts = []
+                for index in range(repeat):
+                    child_length = self.split_length(child_weights, copies[repeat - index - 1], length)
+                    parts.append((node.node, child_length))
+                    length -= child_length
+                stack.extend(reversed(parts))
+        return "".join(buffer)
+
+
+    def generate_constrained(self):
+        """
+        Returns one string of a pattern with lookarounds.
+        The string is generated with every character in its own slot, then the lookarounds
+        narrow and redraw the slots they constrain (see lookaround.satisfy). A new string is
+        only drawn when one can not be fixed, like (?=.*\d) in front of [a-z]{3},
+        or when a backreference refers to a group which took no part in the string
+        """
+        for attempt in range(LOOKAROUND_ATTEMPTS):
+            slots = self.emit_slots(self.tree)
+            if slots is None:
+                continue
+            chars, charsets, marks = slots
+            if satisfy(chars, charsets, marks, self.rng, call if self.profile is None else self.profile.measure):
+                return "".join(chars)
+        raise ValueError("could not generate a string which satisfies the lookarounds of the pattern")
+
+
+    def emit_slots(self, node, stack=None):
+        """
+        Walks the node like emit, but returns every character in its own slot together with
+        the set it was drawn from (None for literal text), and the position of every lookaround.
+        The slots of captured text are fixed once the capture ends, so the lookarounds
+        can not change them and their backreferences stay equal to them.
+        Returns None if a backreference refers to a group which took no part in the string.
+        stack is only given while profiling, see start_profile
+        """
+        chars = []
+        charsets = []
+        marks = []
+        starts = {}
+        spans = {}
+        rng = self.rng
+        choice = self.choice
+        randint = self.randint
+        if stack is None:
+            stack = [node]
+        else:
+            stack.start(node, chars)
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            if node_type is Literal:
+                chars.extend(node.text)
+                charsets.extend([None] * len(node.text))
+            elif node_type is CharClass:
+                chars.append(node.charset.choice(rng))
+                charsets.append(node.charset)
+            elif node_type is Sequence:
+                stack.extend(reversed(node.nodes))
+            elif node_type is Repeat:
+                if node.cum_weights is None:
+                    stack.extend([node.node] * randint(node.min_value, node.max_value))
+                else:
+                    stack.extend([node.node] * (node.min_value + self.pick(node.cum_weights)))
+            elif node_type is Choice:
+                if node.cum_weights is None:
+                    stack.append(choice(node.branches))
+                else:
+                    stack.append(node.branches[self.pick(node.cum_weights)])
+            elif node_type is Lookaround:
+                marks.append((node, len(chars)))
+            elif node_type is Capture:
+                starts[node.number] = len(chars)
+                stack.append(node.end)
+                stack.append(node.node)
+            elif node_type is CaptureEnd:
+                start = starts[node.number]
+                spans[node.number] = (start, len(chars))
+                charsets[start:] = [None] * (len(chars) - start)
+            elif node_type is Backreference:
+                span = spans.get(node.number)
+                if span is None:
+                    return None
+                start, end = span
+                chars.extend(chars[start:end])
+                charsets.extend([None] * (end - start))
+        return chars, charsets, marks
+
+
+    def split_length(self, first_weights, rest_weights, length):
+        """
+        Returns a random length for the first node, such that the nodes after it can make up the rest,
+        weighted by the weights of the first length and of the rest
+        """
+        if len(first_weights) == 1:
+            # a node of one length, like a character class, has nothing to draw
+            return next(iter(first_weights))
+        options = []
+        option_weights = []
+        for first, weight in first_weights.items():
+            rest_weight = rest_weights.get(length - first, 0)
+            if rest_weight > 0:
+                options.append(first)
+                option_weights.append(weight * rest_weight)
+        return options[self.pick_weighted(option_weights)]
+
+
+    def get_length_tables(self, max_len):
+        """
+        Returns the length tables up to max_len, these are kept for the last few lengths used
+        """
+        tables = self.length_cache.get(max_len)
+        if tables is None:
+            tables = length_tables(self.tree, max_len)
+            self.length_cache.put(max_len, tables)
+        return tables
+
+
+    def count(self):
+        """
+        Returns the amount of strings the pattern can generate, with *, + and {x,}
+        bounded by max_repeat. Strictly this counts the ways the tree can generate a string,
+        which is the amount of distinct strings when the regex is unambiguous, like [a-c]{2}-\d{3}.
+        An ambiguous regex counts some strings more than once: [ab]?[ab]? counts 9 for its
+        7 strings and a|a counts 2. With uniform every way is equally likely, so the strings
+        of an ambiguous regex are not
+        """
+        if self.lookarounds or self.backreferences:
+            raise ValueError("can not count the strings of a pattern with lookarounds or backreferences")
+        if self.counts is None:
+            self.counts = count_nodes(self.tree)
+        return self.counts[id(self.tree)]
+
+
+    def set_uniform_weights(self):
+        """
+        Weights every choice branch and repeat amount by the amount of strings it can generate,
+        so every string of the pattern is equally likely instead of the strings of short branches
+        """
+        if self.count() == 0:
+            raise ValueError("the pattern can not generate any string")
+        for node_id, table in self.count_tables().items():
+            node = self.nodes_by_id()[node_id]
+            if type(node) is Choice or node.min_value != node.max_value:
+                node.cum_weights = table
+
+
+    def count_tables(self):
+        """
+        Returns the cumulative counts of the branches of every choice and the amounts of every repeat
+        """
+        if self.tables is None:
+            self.count()
+            self.tables = cumulative_counts(self.tree, self.counts)
+        return self.tables
+
+
+    def alternations(self):
+        """
+        Returns the choices of the pattern in the order their groups open in the regex,
+        the index of a choice here is the one set_weights takes
+        """
+        found = []
+        stack = [self.tree]
+        while stack:
+            node = stack.pop()
+            if type(node) is Choice:
+                found.append(node)
+            stack.extend(reversed(children(node)))
+        return found
+
+
+    def set_weights(self, index, weights):
+        """
+        Sets the weights of the branches of the choice with the index (see alternations),
+        so (GET|POST) with [9, 1] gives GET nine times out of ten. Weights can be ints,
+        floats or fractions, they are turned into exact integer cumulative weights
+        """
+        choices = self.alternations()
+        if index < 0 or index >= len(choices):
+            raise IndexError("the pattern has {} alternations, not {}".format(len(choices), index + 1))
+        node = choices[index]
+        if len(weights) != len(node.branches):
+            raise ValueError("{} weights for {} branches".format(len(weights), len(node.branches)))
+        exact = [fractions.Fraction(weight) for weight in weights]
+        if any(weight < 0 for weight in exact) or sum(exact) == 0:
+            raise ValueError("weights must not be negative and not all zero")
+        scale = math.lcm(*[weight.denominator for weight in exact])
+        node.cum_weights = list(itertools.accumulate(int(weight * scale) for weight in exact))
+        self.length_cache.clear()
+
+
+    def sizeof(self):
+        """
+        Returns the memory the pattern takes in bytes, as a dict with the "Nodes" of its tree,
+        the "Tree" they take, the "Charsets" its character classes draw from, the "Tables" of counts
+        and lengths computed for it so far, the "Regex" text with its re verifier and the "Total".
+        Character sets like \\d or a bracket list which comes up again are shared with other
+        patterns of the generator, they are counted in every pattern that uses them
+        """
+        seen = set()
+        charsets = []
+        tree = deep_sizeof(self.tree, seen, charsets)
+        report = {
+            "Nodes" : len(postorder(self.tree)),
+            "Tree" : tree,
+            "Charsets" : sum(deep_sizeof(charset, seen) for charset in charsets),
+            "Tables" : sum(deep_sizeof(table, seen) for table in [self.counts, self.tables, self.length_cache.entries]),
+            "Regex" : deep_sizeof(self.pattern, seen) + deep_sizeof(self.verifier, seen),
+        }
+        report["Total"] = report["Tree"] + report["Charsets"] + report["Tables"] + report["Regex"]
+        return report
+
+
+    def nodes_by_id(self):
+        """
+        Returns every node of the tree by its id
+        """
+        return {id(node) : node for node in postorder(self.tree)}
+
+
+    def nth(self, index):
+        """
+        Returns the string with the index in the canonical order of the pattern,
+        without going through the strings before it
+        """
+        tables = self.count_tables()
+        return unrank(self.tree, self.counts, tables, index)
+
+
+    def rank(self, string):
+        """
+        Returns the index of the string in the canonical order of the pattern, the inverse of nth.
+        Raises ValueError if the pattern can not generate the string
+        """
+        tables = self.count_tables()
+        return rank(self.tree, self.counts, tables, string)
+
+
+    def iter_all(self, start=0, stop=None):
+        """
+        Yields every string the pattern can generate in canonical order, one at a time.
+        start and stop select a range of indexes, so shards can split the strings between them
+        """
+        total = self.count()
+        if stop is None or stop > total:
+            stop = total
+        tables = self.count_tables()
+        for index in range(start, stop):
+            yield unrank(self.tree, self.counts, tables, index)
+
+
+    def start_profile(self):
+        """
+        Starts counting the calls, time, characters and random draws of every node.
+        The walks and random methods are replaced on this instance only while profiling,
+        they run the same walks on a ProfilingStack, which notes when every node starts and ends.
+        A pattern which is not profiled runs the walks on a plain list.
+        The work lookarounds do on a generated string after the walk is counted on the lookaround.
+        Strings with min_len or max_len are not counted
+        """
+        if self.profile is not None:
+            return self.profile
+        profile = Profile(self.tree)
+        profile.rng = CountingRandom(self.generator.rng)
+        self.profile = profile
+        self.bind_rng(profile.rng)
+        cls = type(self)
+        self.emit_slots = lambda node: profile.walk(cls.emit_slots, False, self, node)
+        self.emit = lambda node, buffer: profile.walk(cls.emit, False, self, node, buffer)
+        self.emit_many = lambda node, amount: profile.walk(cls.emit_many, True, self, node, amount)
+        return profile
+
+
+    def stop_profile(self):
+        """
+        Stops profiling and returns the Profile with the counters, or None if it was not profiling
+        """
+        profile = self.profile
+        if profile is None:
+            return None
+        del self.emit_slots, self.emit, self.emit_many
+        self.bind_rng(self.generator.rng)
+        self.profile = None
+        return profile
+
+
+    def bind_rng(self, rng):
+        """
+        Looks up the random methods of rng once, instead of on every draw
+        """
+        self.rng = rng
+        self.choice = rng.choice
+        self.choices = rng.choices
+        self.randint = rng.randint
+        self.randrange = rng.randrange
+
+
+    def pick(self, cum_weights):
+        """
+        Returns a random index into the cumulative weights, exact for weights of any size
+        """
+        return bisect.bisect_right(cum_weights, self.randrange(cum_weights[-1]))
+
+
+    def pick_weighted(self, weights):
+        """
+        Returns a random index into the weights, with a chance in proportion to its weight
+        """
+        return self.pick(list(itertools.accumulate(weights)))
+
+
+    def pick_many(self, cum_weights, amount):
+        """
+        Returns a list of amount random indexes into the cumulative weights
+        """
+        bisect_right = bisect.bisect_right
+        randrange = self.randrange
+        total = cum_weights[-1]
+        return [bisect_right(cum_weights, randrange(total)) for i in range(amount)]
+
+
+    def generate_unique(self, amount):
+        """
+        Returns a list of amount different strings in random order
+        """
+        return list(self.iter_unique(amount))
+
+
+    def iter_unique(self, amount):
+        """
+        Yields amount different strings in random order, without remembering the ones given out.
+        The indexes 0, 1, 2, ... are sent through a random permutation of all indexes of
+        the pattern and turned into strings with nth, so no index comes out twice.
+
+        An ambiguous regex like [ab]?[ab]? generates some strings at more than one index (see count).
+        Only the lowest index of a string, the one rank returns, is given out, the others are skipped.
+        Raises ValueError once the indexes run out before amount strings, or when UNIQUE_SKIPS
+        indexes in a row are skipped. The check with rank costs far more than nth, it is left out
+        for a tree which can not be ambiguous, like [A-Z]{2}\d{8} or [a-z]{1,12} (see may_be_ambiguous)
+        """
+        total = self.count()
+        if amount > total:
+            raise ValueError("can not generate {} different strings, the pattern has at most {}".format(amount, total))
+        tables = self.count_tables()
+        check = may_be_ambiguous(self.tree)
+        permutation = Permutation(total, self.rng)
+        found = 0
+        skipped = 0
+        index = 0
+        while found < amount:
+            if index == total:
+                raise ValueError("can not generate {} different strings, the pattern has only {}".format(amount, found))
+            position = permutation[index]
+            index += 1
+            string = unrank(self.tree, self.counts, tables, position)
+            if check and rank(self.tree, self.counts, tables, string) != position:
+                skipped += 1
+                if skipped > UNIQUE_SKIPS:
+                    raise ValueError("could not find {} different strings, the pattern generates the same strings in too many ways".format(amount))
+                continue
+            skipped = 0
+            found += 1
+            yield string
+
+
+    def emit(self, node, buffer, stack=None):
+        """
+        Walks the node and appends the generated fragments to the buffer.
+        The nodes still to be walked are kept on an explicit stack in reverse order,
+        so nesting depth and repeat counts never turn into Python recursion.
+
+        Captures are kept as the slice of fragments in the buffer they span, by the number
+        of the group, and a backreference appends that slice of fragments once more.
+        Returns False if a backreference refers to a group which took no part in the string,
+        re does not match such a string (see draw), else True.
+        stack is only given while profiling, see start_profile
+        """
+        append = buffer.append
+        starts = {}
+        spans = {}
+        rng = self.rng
+        choice = self.choice
+        randint = self.randint
+        if stack is None:
+            stack = [node]
+        else:
+            stack.start(node, buffer)
+        pop = stack.pop
+        push = stack.append
+        extend = stack.extend
+        while stack:
+            node = pop()
+            node_type = type(node)
+            if node_type is Literal:
+                append(node.text)
+            elif node_type is CharClass:
+                append(node.charset.choice(rng))
+            elif node_type is Sequence:
+                extend(reversed(node.nodes))
+            elif node_type is Repeat:
+                if node.cum_weights is None:
+                    extend([node.node] * randint(node.min_value, node.max_value))
+                else:
+                    extend([node.node] * (node.min_value + self.pick(node.cum_weights)))
+            elif node_type is Choice:
+                if node.cum_weights is None:
+                    if node.texts is not None:
+                        append(choice(node.texts))
+                    else:
+                        push(choice(node.branches))
+                else:
+                    push(node.branches[self.pick(node.cum_weights)])
+            elif node_type is Capture:
+                starts[node.number] = len(buffer)
+                push(node.end)
+                push(node.node)
+            elif node_type is CaptureEnd:
+                spans[node.number] = (starts[node.number], len(buffer))
+            elif node_type is Backreference:
+                # a group which took no part in the match, like the one of (a)?, fails the backreference in re
+                span = spans.get(node.number)
+                if span is None:
+                    return False
+                buffer.extend(buffer[span[0]:span[1]])
+        return True
+
+
+    def emit_many(self, node, amount, stack=None):
+        """
+        Walks the node once for a batch and returns amount generated fragments.
+        Every node first pushes the work for its children and then a step which combines
+        their fragments, the fragments of finished nodes are kept on a second stack
+        """
+        rng = self.rng
+        choices = self.choices
+        fragments = []
+        if stack is None:
+            stack = [(VISIT, node, amount)]
+        else:
+            stack.start((VISIT, node, amount), fragments)
+        while stack:
+            step, node, amount = stack.pop()
+            if step == VISIT:
+                node_type = type(node)
+                if amount == 0:
+                    fragments.append([])
+                elif node_type is Literal:
+                    fragments.append([node.text] * amount)
+                elif node_type is CharClass:
+                    fragments.append(node.charset.choices(amount, rng))
+                elif node_type is Sequence:
+                    if len(node.nodes) == 0:
+                        # an empty group like () or the empty branch of a|
+                        fragments.append([""] * amount)
+                        continue
+                    stack.append((JOIN_SEQUENCE, node, amount))
+                    for child in reversed(node.nodes):
+                        stack.append((VISIT, child, amount))
+                elif node_type is Repeat:
+                    if node.min_value == node.max_value:
+                        # every fragment in the batch has the same amount of repeats
+                        stack.append((JOIN_FIXED_REPEAT, node.min_value, amount))
+                        stack.append((VISIT, node.node, amount * node.min_value))
+                    else:
+                        if node.cum_weights is None:
+                            amounts = choices(range(node.min_value, node.max_value + 1), k=amount)
+                        else:
+                            amounts = [node.min_value + index for index in self.pick_many(node.cum_weights, amount)]
+                        stack.append((JOIN_REPEAT, amounts, amount))
+                        stack.append((VISIT, node.node, sum(amounts)))
+                elif node_type is Choice:
+                    if node.cum_weights is None:
+                        if node.texts is not None:
+                            # literal branches are drawn straight away, nothing to walk or scatter
+                            fragments.append(choices(node.texts, k=amount))
+                            continue
+                        picks = choices(range(len(node.branches)), k=amount)
+                    else:
+                        picks = self.pick_many(node.cum_weights, amount)
+                        if node.texts is not None:
+                            texts = node.texts
+                            fragments.append([texts[pick] for pick in picks])
+                            continue
+                    positions = [[] for branch in node.branches]
+                    for index, pick in enumerate(picks):
+                        positions[pick].append(index)
+                    stack.append((SCATTER, positions, amount))
+                    for branch, branch_positions in zip(reversed(node.branches), reversed(positions)):
+                        stack.append((VISIT, branch, len(branch_positions)))
+            elif step == JOIN_SEQUENCE:
+                columns = fragments[-len(node.nodes):]
+                del fragments[-len(node.nodes):]
+                fragments.append(list(map("".join, zip(*columns))))
+            elif step == JOIN_FIXED_REPEAT:
+                repeat = node
+                parts = fragments.pop()
+                if repeat == 0:
+                    fragments.append([""] * amount)
+                elif repeat == 1:
+                    fragments.append(parts)
+                else:
+                    fragments.append(["".join(parts[index:index + repeat]) for index in range(0, len(parts), repeat)])
+            elif step == JOIN_REPEAT:
+                parts = fragments.pop()
+                result = []
+                start = 0
+                for repeat in node:
+                    result.append("".join(parts[start:start + repeat]))
+                    start += repeat
+                fragments.append(result)
+            elif step == SCATTER:
+                result = [None] * amount
+                branch_fragments = fragments[-len(node):]
+                del fragments[-len(node):]
+                for branch_positions, branch_result in zip(node, branch_fragments):
+                    for position, fragment in zip(branch_positions, branch_result):
+                        result[position] = fragment
+                fragments.append(result)
+        return fragments[0]
+
+
+def deep_sizeof(value, seen, charsets=None):
+    """
+    Returns the size in bytes of the value and of everything it holds, counting every object once.
+    Objects in seen are skipped and the ones counted are added to it. With a list for charsets,
+    the character sets found are put into it instead of being counted
+    """
+    size = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen or value is None:
+            continue
+        if charsets is not None and type(value) is CharSet:
+            charsets.append(value)
+            continue
+        seen.add(id(value))
+        size += sys.getsizeof(value)
+        value_type = type(value)
+        if value_type is dict:
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif value_type is list or value_type is tuple:
+            stack.extend(value)
+        else:
+            for cls in value_type.__mro__:
+                for name in getattr(cls, "__slots__", ()):
+                    stack.append(getattr(value, name, None))
+    return size
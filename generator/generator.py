@@ -0,0 +1,619 @@
+import random
+import re
+import string
+
+from .cache import PatternCache
+from .charset import UNIVERSE, CharSet, class_tables
+from .compiled import CompiledPattern
+from .store import PatternStore, save_patterns
+from .nodes import Backreference, Capture, Choice, CharClass, Literal, Lookaround, Repeat, build_sequence
+
+# Escapes which are followed by this many hexadecimal digits, like \x41, \u00e9 or \U0001f600
+HEX_ESCAPES = {'x' : 2, 'u' : 4, 'U' : 8}
+CONTROL_ESCAPES = {'n' : '\n', 't' : '\t', 'r' : '\r', 'f' : '\f', 'v' : '\v'}
+
+# Kinds of tokens the tokenizer yields
+LITERAL = "Literal"
+CLASS = "Class"
+QUANTIFIER = "Quantifier"
+OPEN = "Open"
+CLOSE = "Close"
+OR = "Or"
+BACKREF = "Backref"
+
+# Kinds of groups, by how they open
+GROUP = "("
+NAMED_GROUP = "(?P<"
+NAMED_BACKREF = "(?P="
+NON_CAPTURING = "(?:"
+LOOKAROUNDS = ["(?=", "(?!", "(?<=", "(?<!"]
+GROUP_KINDS = [NON_CAPTURING] + LOOKAROUNDS
+
+# Character sets of bracket lists which have been built before, by the text between [ and ] and the universe
+BRACKET_COLLECTIONS_SIZE = 4096
+BRACKET_COLLECTIONS = PatternCache(BRACKET_COLLECTIONS_SIZE)
+
+# Generators with another max_repeat which a Generator keeps for count
+MAX_REPEAT_GENERATORS = 16
+
+
+class Generator:
+    """ 
+    Regular expressions start with a forward slash / followed by the pattern we want to match,
+    and another forward slash / to end it.
+
+    Capture groups and Lookarounds:
+    (abc)       -   capture group
+    (?P<id>abc) -   named capture group
+    \1          -   the text of capture group 1 again
+    (?P=id)     -   the text of the capture group named id again
+    (?:abc)     -   non-capturing group
+    (?=abc)     -   positive lookahead
+    (?!abc)     -   negative lookahead
+    (?<=abc)    -   positive lookbehind
+    (?<!abc)    -   negative lookbehind
+    
+    Quantifiers
+    *           -   0 or more
+    +           -   1 or more
+    ?           -   0 or 1
+    {x,y}       -   between x and y including
+    {x}         -   exactly x times
+    {x,}        -   x or more
+    {,y}        -   up to and inluding y
+    
+    Bracket list
+    [abc]       -   bracket list, any specified character in this list (here a, b, or c)
+    [a-f]       -   any character in the range, here between a and f
+    [^abc]      -   not any one character in this list 
+    
+    Logical operator
+    a|b         -   a or b
+    
+    Metacharacters
+    .           -   any character except new line
+    \d          -   any one digit (same as [0-9])
+    \D          -   any one non-digit (same as [^0-9])
+    \w          -   any word character (same as [a-zA-Z0-9_])
+    \W          -   any non word character (same as [^a-zA-Z0-9_])
+    \s          -   any type of whitespace (whitespace characters are [ \n\r\t\f])
+    \S          -   any type of non whitespace
+    """
+
+    def __init__(self, max_repeat, universe=None, seed=None, rng=None, verify=False, cache_size=256) -> None:
+        self.max_repeat = max_repeat
+        # the characters a negative bracket list [^abc], \D, \W, \S and . are taken from
+        if universe is not None and type(universe) is not CharSet:
+            raise TypeError("the universe must be a CharSet, not {}".format(type(universe).__name__))
+        self.universe = universe if universe is not None else UNIVERSE
+        # the character sets of the escapes by their letter and the set of ., against the universe
+        self.class_tables, self.any_char = class_tables(self.universe)
+        # every instance draws from its own random number generator, the same seed gives the same strings.
+        # rng can be any object with the choice, choices, randint, randrange and getrandbits methods of random.Random
+        self.rng = rng if rng is not None else random.Random(seed)
+        # with verify, every generated string is checked with re and drawn again if it does not match
+        self.verify = verify
+        # counters of the verified strings, by regex: "Checked" strings, "Mismatches" among them and "Time" spent in seconds
+        self.verify_stats = {}
+        # compiled patterns of this instance, by the regex and the options they were compiled with
+        self.cache = PatternCache(cache_size)
+        # compiled patterns saved on disk, which are loaded instead of parsed, see load_store
+        self.store = None
+        # generators for the other max_repeat values count was asked for, by max_repeat
+        self.max_repeat_generators = PatternCache(MAX_REPEAT_GENERATORS)
+
+
+    def generate(self, regex_string, uniform=False, min_len=None, max_len=None):
+        """
+        Returns one string generated from the regex.
+        The compiled regex is kept in the cache, so a regex which comes up again is not parsed again.
+        With min_len and/or max_len the string has a length in between (including)
+        """
+        return self.compile(regex_string, uniform).generate(min_len, max_len)
+
+
+    def compile(self, regex_string, uniform=False):
+        """
+        Parses the regex once into a tree of nodes and returns it as a CompiledPattern.
+        The compiled pattern can generate as many strings as needed without
+        looking at the regex text again.
+        With uniform, every way the regex can generate a string is equally likely,
+        which makes every string equally likely when the regex is unambiguous (see count).
+
+        Compiled patterns are kept in the cache of the instance, by the regex, max_repeat, universe,
+        uniform and verify. The same CompiledPattern is returned for the same regex and options,
+        so weights set on it with set_weights stay set
+        """
+        key = (regex_string, self.max_repeat, self.universe, uniform, self.verify)
+        compiled = self.cache.get(key)
+        if compiled is None:
+            if self.store is not None:
+                compiled = self.store.load(self, regex_string, uniform, self.build_verifier(self.read_source(regex_string)))
+            if compiled is None:
+                compiled = self.build(regex_string, uniform)
+            self.cache.put(key, compiled)
+        return compiled
+
+
+    def build(self, regex_string, uniform=False):
+        """
+        Parses the regex into a CompiledPattern, without looking at the cache
+        """
+        source = self.read_source(regex_string)
+        return CompiledPattern(self, regex_string, self.parse(source), uniform, self.build_verifier(source))
+
+
+    def read_source(self, regex_string):
+        """
+        Returns the regex without the forward slashes around it, if it has them.
+        The empty regex is valid and only generates the empty string
+        """
+        if regex_string == '':
+            return regex_string
+        if regex_string[0] == '/' and regex_string[(len(regex_string)-1)] == '/':
+            return regex_string[1:(len(regex_string)-1)]
+        elif regex_string[0] != '/' and regex_string[(len(regex_string)-1)] != '/':
+            return regex_string
+        raise ValueError("wrong syntax")
+
+
+    def build_verifier(self, source):
+        """
+        Returns the regex compiled with re when verifying, else None
+        """
+        if not self.verify:
+            return None
+        try:
+            return re.compile(source)
+        except re.error as error:
+            raise ValueError("re can not verify the pattern, {}".format(error))
+
+
+    def save_store(self, path, regex_strings, uniform=False):
+        """
+        Compiles the regexes and saves them to a store file at path, together with their
+        counts where they can be counted. A later Generator with the same max_repeat and
+        universe can load_store the file and skip parsing them
+        """
+        patterns = []
+        for regex_string in regex_strings:
+            compiled = self.compile(regex_string, uniform)
+            if not compiled.lookarounds and not compiled.backreferences:
+                compiled.count_tables()
+            patterns.append(compiled)
+        save_patterns(path, patterns, self.max_repeat, self.universe)
+
+
+    def load_store(self, path):
+        """
+        Opens the store file at path, the patterns in it are loaded from it instead of parsed
+        when they are compiled. The store has to be saved with the same max_repeat and universe
+        """
+        store = PatternStore(path)
+        if store.max_repeat != self.max_repeat or store.universe != self.universe:
+            store.close()
+            raise ValueError("{} was saved with another max_repeat or universe".format(path))
+        self.store = store
+
+
+    def generate_many(self, regex_string, amount, uniform=False, min_len=None, max_len=None):
+        """
+        Returns a list of amount strings generated from the regex.
+        The regex is compiled once for the whole batch
+        """
+        return self.compile(regex_string, uniform).generate_many(amount, min_len, max_len)
+
+
+    def profile(self, regex_string, amount, uniform=False):
+        """
+        Generates amount strings from the regex while profiling it and returns the Profile,
+        with the calls, time, characters and random draws of every node of the regex
+        """
+        compiled = self.compile(regex_string, uniform)
+        compiled.start_profile()
+        try:
+            compiled.generate_many(amount)
+        finally:
+            profile = compiled.stop_profile()
+        return profile
+
+
+    def generate_unique(self, regex_string, amount):
+        """
+        Returns a list of amount different strings generated from the regex.
+        Raises ValueError right away if the regex can not generate that many ways (see count),
+        and once they run out if an ambiguous regex has fewer different strings
+        """
+        return self.compile(regex_string).generate_unique(amount)
+
+
+    def count(self, regex_string, max_repeat=None):
+        """
+        Returns the amount of strings the regex can generate, with *, + and {x,}
+        repeating at most max_repeat times (self.max_repeat if not given).
+        This is the amount of ways to generate them, an ambiguous regex like [ab]?[ab]?
+        or a|a counts some strings more than once (9 and 2 instead of 7 and 1)
+        """
+        if max_repeat is not None and max_repeat != self.max_repeat:
+            return self.with_max_repeat(max_repeat).compile(regex_string).count()
+        return self.compile(regex_string).count()
+
+
+    def with_max_repeat(self, max_repeat):
+        """
+        Returns a Generator like this one but with another max_repeat.
+        It is kept, so the patterns it compiled and their counts are reused the next time
+        """
+        generator = self.max_repeat_generators.get(max_repeat)
+        if generator is None:
+            generator = Generator(max_repeat, universe=self.universe, cache_size=self.cache.size)
+            self.max_repeat_generators.put(max_repeat, generator)
+        return generator
+
+
+    def iter_all(self, regex_string, start=0, stop=None):
+        """
+        Yields every string the regex can generate in canonical order, one at a time.
+        start and stop select a range of indexes
+        """
+        return self.compile(regex_string).iter_all(start, stop)
+
+
+    def nth(self, regex_string, index):
+        """
+        Returns the string with the index in the canonical order of the regex
+        """
+        return self.compile(regex_string).nth(index)
+
+
+    def rank(self, regex_string, string):
+        """
+        Returns the index of the string in the canonical order of the regex, the inverse of nth
+        """
+        return self.compile(regex_string).rank(string)
+
+
+    def mismatch_rates(self):
+        """
+        Returns the share of verified strings which did not match, by regex.
+        A regex with a high rate is one the parser does not handle exactly yet
+        """
+        return {regex_string : stats["Mismatches"] / stats["Checked"] for regex_string, stats in self.verify_stats.items() if stats["Checked"] > 0}
+
+
+    def tokenize(self, regex_string):
+        """
+        Walks the regex once from left to right and yields its tokens as (kind, value, index),
+        index being the position of the token in the regex.
+        Bracket lists and escapes become a LITERAL or CLASS token right away,
+        quantifiers become a QUANTIFIER token with a (minimum, maximum) value,
+        groups an OPEN token with a (kind, name) value and backreferences a BACKREF token
+        with the number or name of the group
+        """
+        length = len(regex_string)
+        index = 0
+        while index < length:
+            char = regex_string[index]
+            start = index
+            if char == '\\':
+                if index == (length - 1):
+                    raise ValueError("bad escape (end of pattern) at position {}".format(index))
+                if regex_string[index+1] in '123456789':
+                    # one or two digits, the number of the group the backreference refers to
+                    end = index + 3 if index + 2 < length and regex_string[index+2].isdigit() else index + 2
+                    yield (BACKREF, int(regex_string[(index+1):end]), start)
+                    index = end
+                    continue
+                escaped, index = self.read_escape(regex_string, index)
+                if type(escaped) is CharSet:
+                    yield (CLASS, escaped, start)
+                else:
+                    yield (LITERAL, escaped, start)
+            elif char == '[':
+                closing_bracket = self.find_closing_bracket(regex_string, index)
+                yield (CLASS, self.build_bracket_collection(regex_string[(index+1):closing_bracket]), start)
+                index = closing_bracket + 1
+            elif char == '.':
+                yield (CLASS, self.any_char, start)
+                index += 1
+            elif char in '^$':
+                # anchors do not produce any characters
+                index += 1
+            elif char == '(':
+                if regex_string.startswith(NAMED_BACKREF, index):
+                    name, index = self.read_group_name(regex_string, index + len(NAMED_BACKREF), ')')
+                    yield (BACKREF, name, start)
+                else:
+                    group_kind, name, index = self.read_group_kind(regex_string, index)
+                    yield (OPEN, (group_kind, name), start)
+            elif char == ')':
+                yield (CLOSE, None, start)
+                index += 1
+            elif char == '|':
+                yield (OR, None, start)
+                index += 1
+            elif char in '*+?{':
+                quantifier, index = self.read_quantifier(regex_string, index)
+                if quantifier is None:
+                    # a { which does not start a valid {x,y} block is just a character
+                    yield (LITERAL, char, start)
+                else:
+                    yield (QUANTIFIER, quantifier, start)
+            else:
+                yield (LITERAL, char, start)
+                index += 1
+
+
+    def parse(self, regex_string):
+        """
+        Builds the tree of the regex from its tokens in a single pass.
+        Open groups are kept on an explicit stack, so nesting depth is not limited by recursion.
+
+        Every group keeps the branches it has finished and the nodes of its current branch.
+        A logical or finishes the current branch, so it splits the whole group it is in,
+        and the group becomes one choice between its branches when it closes.
+
+        Capture groups are numbered in the order they open, only the ones a backreference
+        refers to become a Capture node, the others cost nothing
+        """
+        tokens = list(self.tokenize(regex_string))
+        referenced = set(value for kind, value, index in tokens if kind == BACKREF)
+        frame = self.new_frame(GROUP, None, 0)
+        stack = []
+        # numbers of the capture groups by name, and the amount of capture groups opened so far
+        names = {}
+        groups = 0
+        # capture groups inside a lookaround, these are never generated and can not be referred to
+        hidden = set()
+        # numbers of the capture groups which have opened and not closed yet
+        open_groups = set()
+        # what a quantifier applies to: the last "Atom" or "Group", which is the last node of the branch, or None
+        previous = None
+        for kind, value, index in tokens:
+            if kind == LITERAL or kind == CLASS:
+                if kind == CLASS and len(value) == 0:
+                    # like [^\s\S], or a negated class which takes every character of the universe
+                    raise ValueError("character set matches no character, nothing to generate at position {}".format(index))
+                frame["Nodes"].append(Literal(value) if kind == LITERAL else CharClass(value))
+                previous = "Atom"
+            elif kind == QUANTIFIER:
+                if previous is None:
+                    raise ValueError("nothing to repeat at position {}".format(index))
+                frame["Nodes"][-1] = self.build_repeat(frame["Nodes"][-1], value[0], value[1])
+                previous = None
+            elif kind == OR:
+                frame["Branches"].append(frame["Nodes"])
+                frame["Nodes"] = []
+                previous = None
+            elif kind == OPEN:
+                stack.append(frame)
+                group_kind, name = value
+                outer_lookarounds = frame["Lookarounds"]
+                frame = self.new_frame(group_kind, name, index)
+                frame["Lookarounds"] = outer_lookarounds + 1 if group_kind in LOOKAROUNDS else outer_lookarounds
+                if group_kind == GROUP or group_kind == NAMED_GROUP:
+                    groups += 1
+                    frame["Number"] = groups
+                    open_groups.add(groups)
+                    if outer_lookarounds > 0:
+                        hidden.add(groups)
+                    if name is not None:
+                        if name in names:
+                            raise ValueError("redefinition of group name {!r} as group {} at position {}".format(name, groups, index))
+                        names[name] = groups
+                previous = None
+            elif kind == BACKREF:
+                number = names.get(value) if type(value) is str else value
+                if number is None:
+                    raise ValueError("unknown group name {!r} at position {}".format(value, index))
+                if number > groups:
+                    raise ValueError("invalid group reference {} at position {}".format(number, index))
+                if number in open_groups:
+                    raise ValueError("cannot refer to an open group at position {}".format(index))
+                # the lookarounds are checked with re on their own, where the groups are numbered differently
+                if number in hidden or frame["Lookarounds"] > 0:
+                    raise ValueError("backreferences into or inside lookarounds are not supported at position {}".format(index))
+                frame["Nodes"].append(Backreference(number))
+                previous = "Atom"
+            elif kind == CLOSE:
+                if len(stack) == 0:
+                    raise ValueError("unbalanced parenthesis at position {}".format(index))
+                group = self.close_branches(frame)
+                open_groups.discard(frame["Number"])
+                if frame["Kind"] in LOOKAROUNDS:
+                    group = self.build_lookaround(group, frame["Kind"], regex_string, frame["Index"], index)
+                elif frame["Number"] in referenced or frame["Name"] in referenced:
+                    group = Capture(group, frame["Number"])
+                frame = stack.pop()
+                frame["Nodes"].append(group)
+                previous = "Group"
+        if len(stack) > 0:
+            raise ValueError("missing ), unterminated subpattern at position {}".format(frame["Index"]))
+        return self.close_branches(frame)
+
+
+    def new_frame(self, kind, name, index):
+        """
+        Returns the parse state of a group of the given kind which opens at index.
+        The number of a capture group and the amount of "Lookarounds" the group is in,
+        counting itself, are filled in by parse
+        """
+        return {"Kind" : kind, "Name" : name, "Number" : None, "Lookarounds" : 0, "Index" : index, "Nodes" : [], "Branches" : []}
+
+
+    def close_branches(self, frame):
+        """
+        Returns the node of the group, a choice between its branches if it has any logical or
+        """
+        if len(frame["Branches"]) == 0:
+            return build_sequence(frame["Nodes"])
+        frame["Branches"].append(frame["Nodes"])
+        return Choice([build_sequence(nodes) for nodes in frame["Branches"]])
+
+
+    def build_lookaround(self, node, group_kind, regex_string, start, end):
+        """
+        Wraps the body of the lookaround which spans from start up to the ) at end.
+        The lookaround is also compiled with re, which checks it against generated strings
+        """
+        try:
+            assertion = re.compile(regex_string[start:(end+1)])
+        except re.error as error:
+            raise ValueError("{} at position {}".format(error.msg, start + (error.pos or 0)))
+        body = re.compile(regex_string[(start+len(group_kind)):end])
+        return Lookaround(node, group_kind.startswith("(?<"), group_kind.endswith("!"), assertion, body)
+
+
+    def read_group_kind(self, regex_string, index):
+        """
+        Reads the opening of a group at index.
+        Returns the kind of group and its name (None without one), together with the index after the opening
+        """
+        if regex_string.startswith(NAMED_GROUP, index):
+            name, index = self.read_group_name(regex_string, index + len(NAMED_GROUP), '>')
+            return NAMED_GROUP, name, index
+        if regex_string.startswith('(?', index):
+            for group_kind in GROUP_KINDS:
+                if regex_string.startswith(group_kind, index):
+                    return group_kind, None, index + len(group_kind)
+            raise ValueError("unknown extension {} at position {}".format(regex_string[index:(index+3)], index))
+        return GROUP, None, index + 1
+
+
+    def read_group_name(self, regex_string, index, terminator):
+        """
+        Reads the name of a group starting at index up to the terminator.
+        Returns the name, together with the index after the terminator
+        """
+        end = regex_string.find(terminator, index)
+        if end == -1:
+            raise ValueError("missing {}, unterminated name at position {}".format(terminator, index))
+        name = regex_string[index:end]
+        if not name.isidentifier():
+            raise ValueError("bad character in group name {!r} at position {}".format(name, index))
+        return name, end + 1
+
+
+    def read_quantifier(self, regex_string, index):
+        """
+        Reads the quantifier at index.
+        Returns (minimum, maximum), or None if there is no valid quantifier, together with the index after it.
+        A missing minimum is None, a missing maximum as well. A lazy ? behind the quantifier is skipped,
+        because it does not change which strings match
+        """
+        char = regex_string[index]
+        if char == '*':
+            quantifier, index = (0, None), index + 1
+        elif char == '+':
+            quantifier, index = (1, None), index + 1
+        elif char == '?':
+            quantifier, index = (0, 1), index + 1
+        else:
+            # find the closing } of the {x,y} block, only digits and one comma may be in between
+            end = index + 1
+            while end < len(regex_string) and (regex_string[end].isdigit() or regex_string[end] == ','):
+                end += 1
+            block = regex_string[(index+1):end]
+            if end == len(regex_string) or regex_string[end] != '}' or block == '' or block.count(',') > 1:
+                return None, index + 1
+            if ',' in block:
+                min_text, max_text = block.split(',')
+                quantifier = (int(min_text) if min_text != '' else None, int(max_text) if max_text != '' else None)
+            else:
+                quantifier = (int(block), int(block))
+            if quantifier[1] is not None and quantifier[0] is not None and quantifier[1] < quantifier[0]:
+                raise ValueError("min repeat greater than max repeat at position {}".format(index))
+            index = end + 1
+        if index < len(regex_string) and regex_string[index] == '?':
+            index += 1
+        return quantifier, index
+
+
+    def find_closing_bracket(self, regex_string, index):
+        """
+        Returns the index of the ] which closes the bracket list opening at index.
+        A ] right after [ or [^ is part of the list, escaped characters are skipped
+        """
+        end = index + 1
+        if end < len(regex_string) and regex_string[end] == '^':
+            end += 1
+        if end < len(regex_string) and regex_string[end] == ']':
+            end += 1
+        while end < len(regex_string):
+            if regex_string[end] == '\\':
+                end += 2
+            elif regex_string[end] == ']':
+                return end
+            else:
+                end += 1
+        raise ValueError("unterminated character set at position {}".format(index))
+
+
+    def build_repeat(self, node, min_value, max_value):
+        """
+        Wraps the node according to the found quantifier.
+        A missing minimum is 0, a missing maximum is self.max_repeat
+        """
+        if min_value is None:
+            min_value = 0
+        if max_value is None:
+            max_value = max(self.max_repeat, min_value)
+        if min_value == 1 and max_value == 1:
+            return node
+        return Repeat(node, min_value, max_value)
+
+
+    def read_escape(self, regex_string, index):
+        """
+        Reads the escape sequence starting with the backslash at index.
+        Returns the precomputed character set of a metacharacter, or else the single
+        character the sequence stands for, together with the index after the sequence
+        """
+        character = regex_string[index+1]
+        if character in self.class_tables:
+            return self.class_tables[character], index + 2
+        if character in HEX_ESCAPES:
+            width = HEX_ESCAPES[character]
+            digits = regex_string[(index+2):(index+2+width)]
+            if len(digits) != width or not all(digit in string.hexdigits for digit in digits):
+                raise ValueError("bad escape \\{}{}".format(character, digits))
+            return chr(int(digits, 16)), index + 2 + width
+        return CONTROL_ESCAPES.get(character, character), index + 2
+
+
+    def build_bracket_collection(self, regex_string):
+        """
+        Builds the character set of whats between the brackets [ and ], either negative or positive.
+        A negative set is the complement against self.universe.
+        Sets are interned, so a bracket list is only built the first time it is seen
+        """
+        key = (regex_string, self.universe)
+        charset = BRACKET_COLLECTIONS.get(key)
+        if charset is not None:
+            return charset
+        negative = regex_string[0] == '^'
+        index = 1 if negative else 0
+        ranges = []
+        while index < len(regex_string):
+            if regex_string[index] == '\\':
+                item, index = self.read_escape(regex_string, index)
+            else:
+                item, index = regex_string[index], index + 1
+            if type(item) is CharSet:
+                ranges.extend(item.ranges)
+            elif index < (len(regex_string)-1) and regex_string[index] == '-':
+                # the - is followed by the last character of the range
+                if regex_string[index+1] == '\\':
+                    last, index = self.read_escape(regex_string, index + 1)
+                else:
+                    last, index = regex_string[index+1], index + 2
+                if type(last) is CharSet:
+                    raise ValueError("bad character range in [{}]".format(regex_string))
+                ranges.extend(CharSet.from_range(item, last).ranges)
+            else:
+                ranges.append((ord(item), ord(item)))
+        charset = CharSet(ranges)
+        if negative:
+            charset = charset.complement(self.universe)
+        BRACKET_COLLECTIONS.put(key, charset)
+        return charset
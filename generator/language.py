@@ -0,0 +1,331 @@
+import bisect
+import itertools
+import math
+
+from .nodes import Choice, CharClass, Literal, Repeat, Sequence, postorder
+
+
+def count_nodes(tree):
+    """
+    Returns the amount of strings every node of the tree can generate, by id of the node.
+    Children are counted before their parents, so every node is counted once
+    """
+    counts = {}
+    for node in postorder(tree):
+        node_type = type(node)
+        if node_type is Literal:
+            count = 1
+        elif node_type is CharClass:
+            count = len(node.charset)
+        elif node_type is Sequence:
+            count = 1
+            for child in node.nodes:
+                count *= counts[id(child)]
+        elif node_type is Choice:
+            count = sum(counts[id(branch)] for branch in node.branches)
+        elif node_type is Repeat:
+            child_count = counts[id(node.node)]
+            count = sum(child_count ** repeat for repeat in range(node.min_value, node.max_value + 1))
+        counts[id(node)] = count
+    return counts
+
+
+def may_be_ambiguous(tree):
+    """
+    Returns whether the tree may generate a string in more than one way, like [ab]?[ab]? or a|a.
+    False means every index is a different string. This is checked on the shape of the tree:
+    a node is unambiguous when the length of its string tells how to split it between its children,
+    which holds for a sequence with at most one child of a varying length, a repeat of a child
+    with a fixed length like [a-z]{1,12}, and a choice between different literal texts.
+    Other trees, like one with a choice between character classes, are taken as ambiguous
+    """
+    # for every node by id, the length of all of its strings, or None if the length varies
+    lengths = {}
+    for node in postorder(tree):
+        node_type = type(node)
+        if node_type is Literal:
+            length = len(node.text)
+        elif node_type is CharClass:
+            length = 1
+        elif node_type is Sequence:
+            child_lengths = [lengths[id(child)] for child in node.nodes]
+            if child_lengths.count(None) > 1:
+                return True
+            length = None if None in child_lengths else sum(child_lengths)
+        elif node_type is Choice:
+            if node.texts is None or len(set(node.texts)) != len(node.texts):
+                return True
+            length = len(node.texts[0]) if len(set(map(len, node.texts))) == 1 else None
+        elif node_type is Repeat:
+            child_length = lengths[id(node.node)]
+            if node.min_value == node.max_value:
+                if child_length is None and node.max_value > 1:
+                    return True
+                length = None if child_length is None else child_length * node.max_value
+            else:
+                if child_length is None or child_length == 0:
+                    return True
+                length = None
+        else:
+            return True
+        lengths[id(node)] = length
+    return False
+
+
+def cumulative_counts(tree, counts):
+    """
+    Returns the cumulative counts of the choices between the branches of every choice
+    and between the repeat amounts of every repeat, by id of the node.
+    These split the indexes of a node into consecutive blocks, one per branch or repeat amount
+    """
+    tables = {}
+    for node in postorder(tree):
+        if type(node) is Choice:
+            tables[id(node)] = list(itertools.accumulate(counts[id(branch)] for branch in node.branches))
+        elif type(node) is Repeat:
+            child_count = counts[id(node.node)]
+            tables[id(node)] = list(itertools.accumulate(child_count ** repeat for repeat in range(node.min_value, node.max_value + 1)))
+    return tables
+
+
+def unrank(tree, counts, tables, index):
+    """
+    Returns the string with the index in the canonical order of the tree.
+    Choices take their branches in order, repeats their amounts from low to high, and a sequence
+    counts like a number with one digit per node, the last node being the lowest digit
+    """
+    if index < 0 or index >= counts[id(tree)]:
+        raise IndexError("index {} out of range for {} strings".format(index, counts[id(tree)]))
+    buffer = []
+    stack = [(tree, index)]
+    while stack:
+        node, index = stack.pop()
+        node_type = type(node)
+        if node_type is Literal:
+            buffer.append(node.text)
+        elif node_type is CharClass:
+            buffer.append(node.charset[index])
+        elif node_type is Sequence:
+            # the digits come out lowest first, which is the order the stack needs
+            for child in reversed(node.nodes):
+                index, digit = divmod(index, counts[id(child)])
+                stack.append((child, digit))
+        elif node_type is Choice:
+            table = tables[id(node)]
+            branch = bisect.bisect_right(table, index)
+            if branch > 0:
+                index -= table[branch - 1]
+            stack.append((node.branches[branch], index))
+        elif node_type is Repeat:
+            table = tables[id(node)]
+            block = bisect.bisect_right(table, index)
+            if block > 0:
+                index -= table[block - 1]
+            child_count = counts[id(node.node)]
+            for i in range(node.min_value + block):
+                index, digit = divmod(index, child_count)
+                stack.append((node.node, digit))
+    return "".join(buffer)
+
+
+def rank(tree, counts, tables, string):
+    """
+    Returns the index of the string in the canonical order of the tree, the inverse of unrank.
+    If the tree can generate the string in more than one way, the lowest index is returned.
+
+    For every node, bottom up, it finds where the node can end when it starts at a position
+    of the string, together with the lowest index that gets it there
+    """
+    length = len(string)
+    # matches[id(node)][start] is a dict of end position to the lowest index of the node
+    matches = {}
+    for node in postorder(tree):
+        node_type = type(node)
+        node_matches = []
+        for start in range(length + 1):
+            ends = {}
+            if node_type is Literal:
+                if string.startswith(node.text, start):
+                    ends[start + len(node.text)] = 0
+            elif node_type is CharClass:
+                if start < length and string[start] in node.charset:
+                    ends[start + 1] = node.charset.index(string[start])
+            elif node_type is Sequence:
+                ends = {start : 0}
+                for child in node.nodes:
+                    ends = extend_matches(ends, matches[id(child)], counts[id(child)])
+            elif node_type is Choice:
+                offset = 0
+                for branch in node.branches:
+                    for end, index in matches[id(branch)][start].items():
+                        keep_lowest(ends, end, offset + index)
+                    offset += counts[id(branch)]
+            elif node_type is Repeat:
+                child_matches = matches[id(node.node)]
+                child_count = counts[id(node.node)]
+                table = tables[id(node)]
+                repeated = {start : 0}
+                for repeat in range(node.max_value + 1):
+                    if repeat >= node.min_value:
+                        offset = table[repeat - node.min_value - 1] if repeat > node.min_value else 0
+                        for end, index in repeated.items():
+                            keep_lowest(ends, end, offset + index)
+                    if len(repeated) == 0:
+                        break
+                    repeated = extend_matches(repeated, child_matches, child_count)
+            node_matches.append(ends)
+        matches[id(node)] = node_matches
+    index = matches[id(tree)][0].get(length)
+    if index is None:
+        raise ValueError("{!r} can not be generated by the pattern".format(string))
+    return index
+
+
+def extend_matches(ends, child_matches, child_count):
+    """
+    Follows every (end, index) with one more node, whose index becomes the next lowest digit
+    """
+    extended = {}
+    for position, index in ends.items():
+        for end, child_index in child_matches[position].items():
+            keep_lowest(extended, end, index * child_count + child_index)
+    return extended
+
+
+def keep_lowest(ends, end, index):
+    """
+    Stores the index for the end position, unless a lower index is already stored
+    """
+    if end not in ends or index < ends[end]:
+        ends[end] = index
+
+
+def max_length(tree):
+    """
+    Returns the length of the longest string the tree can generate
+    """
+    longest = {}
+    for node in postorder(tree):
+        node_type = type(node)
+        if node_type is Literal:
+            length = len(node.text)
+        elif node_type is CharClass:
+            length = 1
+        elif node_type is Sequence:
+            length = sum(longest[id(child)] for child in node.nodes)
+        elif node_type is Choice:
+            length = max(longest[id(branch)] for branch in node.branches)
+        elif node_type is Repeat:
+            length = longest[id(node.node)] * node.max_value
+        longest[id(node)] = length
+    return longest[id(tree)]
+
+
+def length_tables(tree, cap):
+    """
+    Returns how the strings every node generates spread over the lengths up to cap, weighted like
+    generate draws them: choices and repeats follow their cum_weights, or pick uniformly without,
+    and every character of a class counts once. For a node, weights[n] / total is the chance that
+    it generates a string of length n, so a branch or repeat amount of weight 0 adds nothing.
+    With uniform weights these are the counts of the strings of every length (see count_nodes).
+
+    Returned are, by id of the node: the weights as a dict of length to weight, leaving out
+    the lengths of weight 0, for every choice and repeat the factors its branches or repeat amounts
+    are weighted with, for every repeat the weights of exactly 0 up to max_value copies,
+    and for every sequence the weights of each of its tails (the nodes from index i to the end)
+    """
+    weights = {}
+    # the weight of every length, also the ones above cap, by id of the node
+    totals = {}
+    factors = {}
+    repeats = {}
+    tails = {}
+    for node in postorder(tree):
+        node_type = type(node)
+        if node_type is Literal:
+            node_weights = {len(node.text) : 1} if len(node.text) <= cap else {}
+            total = 1
+        elif node_type is CharClass:
+            node_weights = {1 : len(node.charset)} if cap >= 1 else {}
+            total = len(node.charset)
+        elif node_type is Sequence:
+            tail = [{0 : 1}]
+            total = 1
+            for child in reversed(node.nodes):
+                tail.append(convolve(weights[id(child)], tail[-1], cap))
+                total *= totals[id(child)]
+            tail.reverse()
+            tails[id(node)] = tail
+            node_weights = tail[0]
+        elif node_type is Choice:
+            # every branch is scaled to the same total first, then weighted
+            scale = math.lcm(*[totals[id(branch)] for branch in node.branches])
+            node_factors = [weight * (scale // totals[id(branch)]) for weight, branch in zip(option_weights(node.cum_weights, len(node.branches)), node.branches)]
+            node_weights = {}
+            for factor, branch in zip(node_factors, node.branches):
+                add_weights(node_weights, weights[id(branch)], factor)
+            total = sum(factor * totals[id(branch)] for factor, branch in zip(node_factors, node.branches))
+            node_weights, total, factors[id(node)] = reduce_weights(node_weights, total, node_factors)
+        elif node_type is Repeat:
+            child_weights = weights[id(node.node)]
+            child_total = totals[id(node.node)]
+            copies = [{0 : 1}]
+            for repeat in range(node.max_value):
+                copies.append(convolve(copies[-1], child_weights, cap))
+            repeats[id(node)] = copies
+            # repeat amounts are scaled to the total of max_value copies first, then weighted
+            amounts = node.max_value - node.min_value + 1
+            node_factors = [weight * child_total ** (amounts - 1 - index) for index, weight in enumerate(option_weights(node.cum_weights, amounts))]
+            node_weights = {}
+            for index, factor in enumerate(node_factors):
+                add_weights(node_weights, copies[node.min_value + index], factor)
+            total = sum(factor * child_total ** (node.min_value + index) for index, factor in enumerate(node_factors))
+            node_weights, total, factors[id(node)] = reduce_weights(node_weights, total, node_factors)
+        weights[id(node)] = node_weights
+        totals[id(node)] = total
+    return weights, factors, repeats, tails
+
+
+def option_weights(cum_weights, amount):
+    """
+    Returns the weights of the amount options of a choice or repeat out of their cumulative weights,
+    all 1 without cumulative weights
+    """
+    if cum_weights is None:
+        return [1] * amount
+    return [cum_weights[index] - (cum_weights[index - 1] if index > 0 else 0) for index in range(amount)]
+
+
+def convolve(first, second, cap):
+    """
+    Returns the weights of the lengths of a string of the first followed by a string of the second,
+    up to cap
+    """
+    result = {}
+    for first_length, first_weight in first.items():
+        for second_length, second_weight in second.items():
+            length = first_length + second_length
+            if length <= cap:
+                result[length] = result.get(length, 0) + first_weight * second_weight
+    return result
+
+
+def add_weights(weights, other, factor):
+    """
+    Adds the other weights times the factor to the weights, leaving out weights of 0
+    """
+    if factor == 0:
+        return
+    for length, weight in other.items():
+        weights[length] = weights.get(length, 0) + weight * factor
+
+
+def reduce_weights(weights, total, factors):
+    """
+    Divides the weights, the total and the factors by their greatest common divisor,
+    which keeps the numbers of nested choices and repeats small without changing any chance
+    """
+    divisor = math.gcd(total, *weights.values(), *factors)
+    if divisor <= 1:
+        return weights, total, factors
+    return {length : weight // divisor for length, weight in weights.items()}, total // divisor, [factor // divisor for factor in factors]
@@ -0,0 +1,179 @@
+import functools
+
+from .charset import CharSet
+from .language import max_length
+from .nodes import Capture, Choice, CharClass, Literal, Repeat, Sequence
+
+# Rounds of breaking negative lookarounds before a string is given up
+ROUNDS = 10
+
+# Intersections of character sets which are kept, the least recently used one is dropped beyond that
+INTERSECTIONS_SIZE = 4096
+
+
+def call(node, function, *arguments):
+    """
+    Returns function(*arguments), satisfy runs the steps for a lookaround through this while not profiling
+    """
+    return function(*arguments)
+
+
+def satisfy(chars, charsets, marks, rng, measure=call):
+    """
+    Changes the characters of a generated string in place until every lookaround holds.
+    chars has one character per slot, charsets the set each slot was drawn from (None for
+    literal text) and marks the (lookaround, position) of every lookaround in the string.
+
+    Positive lookarounds place a string their body matches onto the slots at their position,
+    by narrowing those slots to the intersection with the body. Negative lookarounds which
+    still match are broken by redrawing one of the slots they match. Slots only ever change
+    within their narrowed set, so the pattern and the placed lookarounds keep matching.
+    Returns False if the string can not be fixed, the caller draws a new one then.
+
+    Every step for a lookaround runs as measure(lookaround, step, *arguments), which counts
+    the step against the lookaround while profiling (see Profile.measure)
+    """
+    for lookaround, position in marks:
+        if not lookaround.negative and not measure(lookaround, place, chars, charsets, lookaround, position, rng):
+            return False
+    for round in range(ROUNDS):
+        text = "".join(chars)
+        failed = [(lookaround, position) for lookaround, position in marks if not measure(lookaround, holds, lookaround, text, position)]
+        if len(failed) == 0:
+            return True
+        for lookaround, position in failed:
+            if not lookaround.negative or not measure(lookaround, break_match, chars, charsets, lookaround, position, rng):
+                return False
+    return False
+
+
+def holds(lookaround, text, position):
+    """
+    Returns whether the lookaround holds at the position of the text
+    """
+    return lookaround.assertion.match(text, position) is not None
+
+
+def place(chars, charsets, lookaround, position, rng):
+    """
+    Narrows the slots at position to a random string of the body of a positive lookaround.
+    A lookahead body starting with a repeated set like the .* of (?=.*\\d) may skip
+    ahead over slots of that set first, any offset that fits is taken at random
+    """
+    node = lookaround.node
+    gap = None
+    if not lookaround.behind:
+        first = node.nodes[0] if type(node) is Sequence else node
+        if type(first) is Repeat and type(first.node) is CharClass:
+            gap = first
+            node = Sequence(node.nodes[1:]) if type(node) is Sequence else Sequence([])
+    window = sample_window(node, rng)
+    if lookaround.behind:
+        starts = [position - len(window)] if position >= len(window) else []
+    elif gap is None:
+        starts = [position]
+    else:
+        starts = []
+        last = min(position + gap.max_value, len(chars) - len(window))
+        start = position
+        # the slots skipped over have to fit the set of the gap as well
+        while start < position + gap.min_value and start < len(chars) and fits(chars, charsets, start, gap.node.charset):
+            start += 1
+        if start == position + gap.min_value:
+            while start <= last:
+                starts.append(start)
+                if not fits(chars, charsets, start, gap.node.charset):
+                    break
+                start += 1
+    starts = [start for start in starts if start + len(window) <= len(chars) and all(fits(chars, charsets, start + offset, charset) for offset, charset in enumerate(window))]
+    if len(starts) == 0:
+        return False
+    start = rng.choice(starts)
+    if gap is not None:
+        for index in range(position, start):
+            narrow(chars, charsets, index, gap.node.charset, rng)
+    for offset, charset in enumerate(window):
+        narrow(chars, charsets, start + offset, charset, rng)
+    return True
+
+
+def break_match(chars, charsets, lookaround, position, rng):
+    """
+    Redraws one slot the body of a negative lookaround matches, so that the lookaround holds.
+    Returns False if no single slot can be changed to get there
+    """
+    text = "".join(chars)
+    if lookaround.behind:
+        # re only allows lookbehinds of a fixed width
+        indexes = list(range(max(0, position - max_length(lookaround.node)), position))
+    else:
+        match = lookaround.body.match(text, position)
+        indexes = list(range(match.start(), match.end()))
+    while indexes:
+        # the slots are tried in random order, rng only has the methods listed on Generator
+        index = indexes.pop(rng.randrange(len(indexes)))
+        charset = charsets[index]
+        if charset is None or len(charset) < 2:
+            continue
+        old = chars[index]
+        chars[index] = charset.difference(CharSet.from_chars(old)).choice(rng)
+        if lookaround.assertion.match("".join(chars), position) is not None:
+            return True
+        chars[index] = old
+    return False
+
+
+def sample_window(node, rng):
+    """
+    Returns the character sets, one per character, of a random string shape of the node.
+    Repeats take their minimum amount, which keeps the shape as short as possible to place
+    """
+    window = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is Literal:
+            window.extend(CharSet.from_chars(char) for char in node.text)
+        elif node_type is CharClass:
+            window.append(node.charset)
+        elif node_type is Sequence:
+            stack.extend(reversed(node.nodes))
+        elif node_type is Repeat:
+            stack.extend([node.node] * node.min_value)
+        elif node_type is Choice:
+            stack.append(rng.choice(node.branches))
+        elif node_type is Capture:
+            stack.append(node.node)
+    return window
+
+
+def fits(chars, charsets, index, charset):
+    """
+    Returns whether the slot at index can hold a character of the set
+    """
+    if index >= len(chars):
+        return False
+    if charsets[index] is None:
+        return chars[index] in charset
+    return len(intersect(charsets[index], charset)) > 0
+
+
+def narrow(chars, charsets, index, charset, rng):
+    """
+    Narrows the slot at index to the set, redrawing its character if it falls outside
+    """
+    if charsets[index] is None:
+        return
+    narrowed = intersect(charsets[index], charset)
+    charsets[index] = narrowed
+    if chars[index] not in narrowed:
+        chars[index] = narrowed.choice(rng)
+
+
+@functools.lru_cache(maxsize=INTERSECTIONS_SIZE)
+def intersect(first, second):
+    """
+    Returns the intersection of the two sets, the same pairs come up for every string of a pattern
+    """
+    return first.intersection(second)
@@ -0,0 +1,167 @@
+class Literal:
+    """
+    Fixed text which is emitted as is
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, text) -> None:
+        self.text = text
+
+
+class CharClass:
+    """
+    One random character out of the character set
+    """
+
+    __slots__ = ("charset",)
+
+    def __init__(self, charset) -> None:
+        self.charset = charset
+
+
+class Repeat:
+    """
+    The node repeated a random amount of times between and including min_value and max_value
+    """
+
+    __slots__ = ("node", "min_value", "max_value", "cum_weights")
+
+    def __init__(self, node, min_value, max_value) -> None:
+        self.node = node
+        self.min_value = min_value
+        self.max_value = max_value
+        # cumulative weights of the repeat amounts min_value up to max_value, None draws them uniformly
+        self.cum_weights = None
+
+
+class Sequence:
+    """
+    The nodes emitted one after another
+    """
+
+    __slots__ = ("nodes",)
+
+    def __init__(self, nodes) -> None:
+        self.nodes = tuple(nodes)
+
+
+class Choice:
+    """
+    One random branch out of the branches (logical or)
+    """
+
+    __slots__ = ("branches", "cum_weights", "texts")
+
+    def __init__(self, branches) -> None:
+        self.branches = tuple(branches)
+        # cumulative weights of the branches, None picks them uniformly
+        self.cum_weights = None
+        # the texts of the branches when every branch is literal text, like (GET|POST), else None
+        self.texts = None
+        if all(type(branch) is Literal for branch in branches):
+            self.texts = tuple(branch.text for branch in branches)
+
+
+class Lookaround:
+    """
+    A lookahead or lookbehind, which generates no characters itself but constrains
+    the characters around the position it is at
+    """
+
+    __slots__ = ("node", "behind", "negative", "assertion", "body")
+
+    def __init__(self, node, behind, negative, assertion, body) -> None:
+        self.node = node
+        self.behind = behind
+        self.negative = negative
+        # the whole lookaround and its body compiled with re, to check them against a generated string
+        self.assertion = assertion
+        self.body = body
+
+
+class Capture:
+    """
+    A capture group whose text is used again by a backreference
+    """
+
+    __slots__ = ("node", "number", "end")
+
+    def __init__(self, node, number) -> None:
+        self.node = node
+        self.number = number
+        # walked right after the node, marks where the captured text ends
+        self.end = CaptureEnd(number)
+
+
+class CaptureEnd:
+    """
+    The end of the text of a capture group, while walking the tree
+    """
+
+    __slots__ = ("number",)
+
+    def __init__(self, number) -> None:
+        self.number = number
+
+
+class Backreference:
+    """
+    The text of the capture group with the number, once more
+    """
+
+    __slots__ = ("number",)
+
+    def __init__(self, number) -> None:
+        self.number = number
+
+
+def build_sequence(nodes):
+    """
+    Builds a sequence out of the nodes, merging literals which follow each other.
+    A sequence of a single node is just that node
+    """
+    merged = []
+    texts = []
+    for node in nodes:
+        if type(node) is Literal:
+            texts.append(node.text)
+            continue
+        if len(texts) > 0:
+            merged.append(Literal("".join(texts)))
+            texts = []
+        merged.append(node)
+    if len(texts) > 0:
+        merged.append(Literal("".join(texts)))
+    if len(merged) == 1:
+        return merged[0]
+    return Sequence(merged)
+
+
+def children(node):
+    """
+    Returns the child nodes of the node
+    """
+    node_type = type(node)
+    if node_type is Sequence:
+        return node.nodes
+    elif node_type is Choice:
+        return node.branches
+    elif node_type is Repeat or node_type is Capture:
+        return [node.node]
+    return []
+
+
+def postorder(node):
+    """
+    Returns the node and all nodes below it, every node after all of its children.
+    Uses an explicit stack, so deeply nested trees do not recurse
+    """
+    order = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(children(node))
+    order.reverse()
+    return order
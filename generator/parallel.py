@@ -0,0 +1,158 @@
+import collections
+import hashlib
+import multiprocessing
+import os
+
+from .generator import Generator
+
+# generators of this worker process, by max_repeat, universe, verify and store file.
+# Their PatternCache keeps the compiled patterns, bounded like in any other Generator
+_worker_generators = {}
+
+
+def derive_seed(seed, regex_string, index):
+    """
+    Derives the seed of chunk index of the regex from the master seed.
+    The same master seed, regex and index always give the same seed, in any process
+    """
+    digest = hashlib.sha256("{}:{}:{}".format(seed, regex_string, index).encode("utf-8", "surrogatepass")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def worker_generator(max_repeat, universe, verify, store):
+    """
+    Returns the generator of this process for the options, created on first use
+    """
+    key = (max_repeat, universe, verify, store)
+    generator = _worker_generators.get(key)
+    if generator is None:
+        generator = Generator(max_repeat, universe=universe, verify=verify)
+        if store is not None:
+            generator.load_store(store)
+        _worker_generators[key] = generator
+    return generator
+
+
+def generate_chunk(task):
+    """
+    Generates one chunk of strings, this runs inside the worker processes.
+    The generator of the compiled pattern is reseeded with the seed of the chunk first,
+    so the chunk does not depend on which worker runs it or what it ran before.
+    Returns the strings and, with verify, the verification counters of this chunk, else None
+    """
+    pattern, max_repeat, universe, verify, store, chunk_seed, amount = task
+    generator = worker_generator(max_repeat, universe, verify, store)
+    compiled = generator.compile(pattern)
+    generator.rng.seed(chunk_seed)
+    if compiled.stats is None:
+        return compiled.generate_many(amount), None
+    before = dict(compiled.stats)
+    strings = compiled.generate_many(amount)
+    return strings, {name : value - before[name] for name, value in compiled.stats.items()}
+
+
+class ParallelGenerator:
+    """
+    Splits a generate_many request into chunks of chunk_size strings and generates
+    the chunks on a pool of worker processes.
+
+    Every chunk gets its own seed derived from the master seed, the regex and the index of the chunk,
+    so the same seed and chunk_size give the same strings whatever the amount of workers.
+    With 1 worker the chunks are generated in this process. With verify the workers
+    check every string with re, see Generator, and their counters are added up in verify_stats.
+    With a store file (see Generator.save_store) the workers load the patterns in it instead of parsing them
+    """
+
+    def __init__(self, max_repeat, workers=None, seed=None, chunk_size=10000, universe=None, verify=False, store=None) -> None:
+        self.max_repeat = max_repeat
+        self.workers = workers if workers is not None else multiprocessing.cpu_count()
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(8), "big")
+        self.chunk_size = chunk_size
+        self.universe = universe
+        self.verify = verify
+        self.store = store
+        # counters of the strings verified by the workers, by regex, like Generator.verify_stats
+        self.verify_stats = {}
+        self.pool = None
+
+
+    def compile(self, regex_string):
+        """
+        Returns the compiled pattern the chunks of this process are generated with.
+        With 1 worker that is every chunk, so it can be profiled (see CompiledPattern.start_profile)
+        """
+        return worker_generator(self.max_repeat, self.universe, self.verify, self.store).compile(regex_string)
+
+
+    def generate_many(self, regex_string, amount):
+        """
+        Returns a list of amount strings generated from the regex
+        """
+        result = []
+        for chunk in self.iter_chunks(regex_string, amount):
+            result.extend(chunk)
+        return result
+
+
+    def iter_chunks(self, regex_string, amount):
+        """
+        Yields the strings for the regex chunk by chunk, in order.
+        Only a few chunks per worker are in flight at once, so memory does not grow with amount
+        """
+        # compile once here as well, so a broken regex fails before any work is sent out
+        Generator(self.max_repeat, universe=self.universe, verify=self.verify).compile(regex_string)
+        tasks = self.build_tasks(regex_string, amount)
+        if self.workers <= 1:
+            for task in tasks:
+                yield self.collect(regex_string, generate_chunk(task))
+            return
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.workers)
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(self.pool.apply_async(generate_chunk, (task,)))
+            if len(pending) >= self.workers * 2:
+                yield self.collect(regex_string, pending.popleft().get())
+        while len(pending) > 0:
+            yield self.collect(regex_string, pending.popleft().get())
+
+
+    def collect(self, regex_string, result):
+        """
+        Adds the verification counters of a finished chunk to verify_stats and returns its strings
+        """
+        strings, stats = result
+        if stats is not None:
+            totals = self.verify_stats.setdefault(regex_string, {"Checked" : 0, "Mismatches" : 0, "Time" : 0.0})
+            for name, value in stats.items():
+                totals[name] += value
+        return strings
+
+
+    def build_tasks(self, regex_string, amount):
+        """
+        Yields the task of every chunk, the last chunk holds what is left of amount
+        """
+        index = 0
+        for start in range(0, amount, self.chunk_size):
+            chunk_amount = min(self.chunk_size, amount - start)
+            yield (regex_string, self.max_repeat, self.universe, self.verify, self.store, derive_seed(self.seed, regex_string, index), chunk_amount)
+            index += 1
+
+
+    def close(self):
+        """
+        Stops the worker processes
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
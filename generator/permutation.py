@@ -0,0 +1,64 @@
+import hashlib
+
+MASK_64 = (1 << 64) - 1
+
+
+class Permutation:
+    """
+    A random bijection of the indexes 0 up to size onto themselves, which is never stored.
+
+    A balanced Feistel network with random round keys shuffles the smallest domain of
+    an even amount of bits that holds size. Results outside of size are fed through the network
+    again (cycle walking) until they land inside, which stays a bijection on 0 up to size
+    and takes less than 4 rounds through the network on average
+    """
+
+    ROUNDS = 6
+
+    def __init__(self, size, rng) -> None:
+        self.size = size
+        half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+        self.half_bits = half_bits
+        self.half_mask = (1 << half_bits) - 1
+        self.keys = [rng.getrandbits(64) | 1 for i in range(self.ROUNDS)]
+
+
+    def __getitem__(self, index):
+        if index < 0 or index >= self.size:
+            raise IndexError("index {} out of range for a permutation of {}".format(index, self.size))
+        value = self.shuffle(index)
+        while value >= self.size:
+            value = self.shuffle(value)
+        return value
+
+
+    def __len__(self):
+        return self.size
+
+
+    def shuffle(self, value):
+        """
+        One pass of value through the Feistel network
+        """
+        half_bits = self.half_bits
+        half_mask = self.half_mask
+        left = value >> half_bits
+        right = value & half_mask
+        for key in self.keys:
+            left, right = right, left ^ (self.mix(right, key) & half_mask)
+        return (left << half_bits) | right
+
+
+    def mix(self, value, key):
+        """
+        The round function, scrambles value with the round key.
+        It does not need to be invertible, the Feistel network is a bijection whatever it returns.
+        Halves of up to 64 bits use a multiply and shift mixer, larger ones a keyed hash
+        """
+        if self.half_bits <= 64:
+            value = ((value ^ key) * 0x9E3779B97F4A7C15) & MASK_64
+            value ^= value >> 29
+            value = (value * 0xBF58476D1CE4E5B9) & MASK_64
+            return value ^ (value >> 32)
+        digest = hashlib.blake2b(value.to_bytes((self.half_bits + 7) // 8, "big"), key=key.to_bytes(8, "big")).digest()
+        return int.from_bytes(digest, "big")
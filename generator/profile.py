@@ -0,0 +1,231 @@
+import time
+
+from .nodes import Backreference, Capture, CaptureEnd, Choice, CharClass, Literal, Lookaround, Repeat, Sequence, children, postorder
+
+
+class CountingRandom:
+    """
+    Wraps a random number generator and counts the random numbers drawn from it.
+    choices counts one draw per element, every other method one draw per call
+    """
+
+    def __init__(self, rng) -> None:
+        self.rng = rng
+        self.draws = 0
+
+
+    def choice(self, sequence):
+        self.draws += 1
+        return self.rng.choice(sequence)
+
+
+    def choices(self, population, weights=None, cum_weights=None, k=1):
+        self.draws += k
+        return self.rng.choices(population, weights, cum_weights=cum_weights, k=k)
+
+
+    def randint(self, first, last):
+        self.draws += 1
+        return self.rng.randint(first, last)
+
+
+    def randrange(self, *arguments):
+        self.draws += 1
+        return self.rng.randrange(*arguments)
+
+
+    def getrandbits(self, bits):
+        self.draws += 1
+        return self.rng.getrandbits(bits)
+
+
+class Profile:
+    """
+    Counters of every node of a pattern, collected while it generates strings:
+    the "Calls" of the node, the "Time" in seconds spent in it, the "Chars" it emitted
+    and the random numbers it drew ("Draws"). Time, characters and draws include
+    the nodes below it, so the root holds the totals.
+    The counters come from the walks generation really uses, a batch of generate_many
+    visits a node once for all of its strings, so there one call covers many strings.
+    A lookaround also holds the time and draws of placing, checking and breaking it
+    once the walk is done, see measure
+    """
+
+    def __init__(self, tree) -> None:
+        self.tree = tree
+        self.rng = None
+        # counters by id of the node
+        self.counters = {}
+        # the node above every node of the tree, by id of the node, built on first use
+        self.parents = None
+
+
+    def walk(self, function, batch, *arguments):
+        """
+        Runs a walk of CompiledPattern (emit, emit_slots or emit_many, which is a batch walk)
+        on a ProfilingStack and returns what it returns
+        """
+        stack = ProfilingStack(self, batch)
+        try:
+            return function(*arguments, stack=stack)
+        finally:
+            stack.finish()
+
+
+    def measure(self, node, function, *arguments):
+        """
+        Runs function(*arguments) for the node outside of a walk, like the steps lookaround.satisfy
+        takes for a lookaround, and returns what it returns. Its time and random draws are added
+        to the node and to every node above it, its calls and characters are already counted by the walk
+        """
+        start = time.perf_counter()
+        draws = self.rng.draws
+        try:
+            return function(*arguments)
+        finally:
+            elapsed = time.perf_counter() - start
+            drawn = self.rng.draws - draws
+            if self.parents is None:
+                self.parents = {id(child) : parent for parent in postorder(self.tree) for child in children(parent)}
+            while node is not None:
+                counter = self.counter(node)
+                counter["Time"] += elapsed
+                counter["Draws"] += drawn
+                node = self.parents.get(id(node))
+
+
+    def counter(self, node):
+        """
+        Returns the counters of the node, created on first use
+        """
+        counter = self.counters.get(id(node))
+        if counter is None:
+            counter = {"Calls" : 0, "Time" : 0.0, "Chars" : 0, "Draws" : 0}
+            self.counters[id(node)] = counter
+        return counter
+
+
+    def report(self):
+        """
+        Returns the counters of every node which was walked, in the order of the regex,
+        as dicts with the "Node" described in regex syntax and its "Depth" in the tree
+        """
+        rows = []
+        stack = [(self.tree, 0)]
+        while stack:
+            node, depth = stack.pop()
+            counter = self.counters.get(id(node))
+            if counter is None:
+                continue
+            rows.append(dict(Node=describe(node), Depth=depth, **counter))
+            below = list(children(node))
+            if type(node) is Lookaround:
+                below.append(node.node)
+            stack.extend((child, depth + 1) for child in reversed(below))
+        return rows
+
+
+    def format(self):
+        """
+        Returns the report as a table, one line per node indented by its depth
+        """
+        rows = self.report()
+        lines = ["{:>10} {:>10} {:>12} {:>10}  {}".format("calls", "time (ms)", "chars", "draws", "node")]
+        for row in rows:
+            lines.append("{:>10} {:>10.3f} {:>12} {:>10}  {}{}".format(
+                row["Calls"], row["Time"] * 1000, row["Chars"], row["Draws"], "  " * row["Depth"], row["Node"]))
+        return "\n".join(lines)
+
+
+def describe(node):
+    """
+    Returns a short description of the node in regex syntax
+    """
+    node_type = type(node)
+    if node_type is Literal:
+        return repr(node.text)
+    elif node_type is CharClass:
+        parts = []
+        for first, last in node.charset.ranges[:8]:
+            parts.append(chr(first) if first == last else "{}-{}".format(chr(first), chr(last)))
+        if len(node.charset.ranges) > 8:
+            parts.append("...")
+        return repr("[" + "".join(parts) + "]")
+    elif node_type is Sequence:
+        return "sequence of {}".format(len(node.nodes))
+    elif node_type is Choice:
+        return "choice of {}".format(len(node.branches))
+    elif node_type is Repeat:
+        return "repeat {{{},{}}}".format(node.min_value, node.max_value)
+    elif node_type is Capture:
+        return "group {}".format(node.number)
+    elif node_type is Backreference:
+        return "\\{}".format(node.number)
+    elif node_type is Lookaround:
+        return "lookaround {}".format(node.assertion.pattern)
+    return node_type.__name__
+
+
+class ProfilingStack(list):
+    """
+    The work stack of a walk while profiling. The walks take one element at a time
+    with pop, so a node starts when it is popped and ends, together with everything it
+    pushed, once an item below the position it was popped from is popped.
+    The batch walk emit_many pushes (step, node, amount), only its VISIT steps start a node
+    """
+
+    def __init__(self, profile, batch) -> None:
+        super().__init__()
+        self.profile = profile
+        self.batch = batch
+        self.output = None
+        # (node, depth, clock, output length, draws) of the nodes which have not ended yet
+        self.running = []
+
+
+    def start(self, item, output):
+        """
+        Pushes the first item of the walk, output is the list the walk emits into
+        """
+        self.output = output
+        self.append(item)
+
+
+    def pop(self):
+        # the items a node pushed are at its depth and above, once the next item is below that it has ended
+        self.end(len(self))
+        item = list.pop(self)
+        depth = len(self)
+        if self.batch:
+            # VISIT is 0, see compiled.py
+            node = item[1] if item[0] == 0 else None
+        else:
+            node = item
+        if node is not None and type(node) is not CaptureEnd:
+            self.profile.counter(node)["Calls"] += 1
+            self.running.append((node, depth, time.perf_counter(), len(self.output), self.profile.rng.draws))
+        return item
+
+
+    def end(self, depth):
+        """
+        Adds up the counters of the nodes popped at depth or above, their work is done
+        """
+        running = self.running
+        while running and running[-1][1] >= depth:
+            node, node_depth, start, length, draws = running.pop()
+            counter = self.profile.counter(node)
+            counter["Time"] += time.perf_counter() - start
+            if self.batch:
+                # the fragments of a finished node are on top of the fragment stack
+                counter["Chars"] += sum(map(len, self.output[-1])) if len(self.output) > length else 0
+            else:
+                counter["Chars"] += sum(map(len, self.output[length:]))
+            counter["Draws"] += self.profile.rng.draws - draws
+
+
+    def finish(self):
+        """
+        Ends every node which is still running once the walk returns
+        """
+        self.end(0)
@@ -0,0 +1,191 @@
+import marshal
+import mmap
+import re
+import struct
+
+from .charset import CharSet
+from .compiled import CompiledPattern
+from .nodes import Backreference, Capture, Choice, CharClass, Literal, Lookaround, Repeat, Sequence, children
+
+# Start of every store file, followed by the version of the format
+MAGIC = b"RGEN"
+FORMAT_VERSION = 1
+
+# Kinds of node records
+LITERAL = 0
+CHAR_CLASS = 1
+SEQUENCE = 2
+CHOICE = 3
+REPEAT = 4
+CAPTURE = 5
+BACKREFERENCE = 6
+LOOKAROUND = 7
+
+# magic, format version, marshal version, max_repeat and the length of the index, little endian
+HEADER = struct.Struct("<4sHHIQ")
+
+
+def save_patterns(path, patterns, max_repeat, universe):
+    """
+    Writes the compiled patterns to a store file at path.
+
+    The file starts with a fixed header, followed by the index: the ranges of every character set
+    the patterns use, each stored once, and the (regex, uniform, offset, length) of every pattern.
+    Then come the records of the patterns, each one the nodes of its tree (children before
+    their parents, referring to them by index) with the counts and cumulative tables of the nodes
+    if they were computed. The index and the records are marshal data, which loads
+    without any Python code per value, so the marshal version is checked when opening
+    """
+    charsets = [universe]
+    charset_indexes = {universe : 0}
+    records = [marshal.dumps(encode_pattern(compiled, charsets, charset_indexes)) for compiled in patterns]
+    directory = []
+    offset = 0
+    for compiled, record in zip(patterns, records):
+        directory.append((compiled.pattern, compiled.uniform, offset, len(record)))
+        offset += len(record)
+    index = marshal.dumps(([charset.ranges for charset in charsets], directory))
+    with open(path, "wb") as store_file:
+        store_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, max_repeat, len(index)))
+        store_file.write(index)
+        for record in records:
+            store_file.write(record)
+
+
+def encode_pattern(compiled, charsets, charset_indexes):
+    """
+    Returns the record of one compiled pattern as a tuple, adding the character sets it uses to the table
+    """
+    nodes = all_nodes(compiled.tree)
+    indexes = {id(node) : index for index, node in enumerate(nodes)}
+    encoded = []
+    for node in nodes:
+        node_type = type(node)
+        if node_type is Literal:
+            encoded.append((LITERAL, node.text))
+        elif node_type is CharClass:
+            if node.charset not in charset_indexes:
+                charset_indexes[node.charset] = len(charsets)
+                charsets.append(node.charset)
+            encoded.append((CHAR_CLASS, charset_indexes[node.charset]))
+        elif node_type is Sequence:
+            encoded.append((SEQUENCE, tuple(indexes[id(child)] for child in node.nodes)))
+        elif node_type is Choice:
+            encoded.append((CHOICE, tuple(indexes[id(branch)] for branch in node.branches), node.cum_weights))
+        elif node_type is Repeat:
+            encoded.append((REPEAT, indexes[id(node.node)], node.min_value, node.max_value, node.cum_weights))
+        elif node_type is Capture:
+            encoded.append((CAPTURE, indexes[id(node.node)], node.number))
+        elif node_type is Backreference:
+            encoded.append((BACKREFERENCE, node.number))
+        elif node_type is Lookaround:
+            encoded.append((LOOKAROUND, indexes[id(node.node)], node.behind, node.negative, node.assertion.pattern, node.body.pattern))
+    counts = None
+    if compiled.counts is not None:
+        counts = [compiled.counts[id(node)] for node in nodes]
+    tables = None
+    if compiled.tables is not None:
+        tables = [compiled.tables.get(id(node)) for node in nodes]
+    return (encoded, counts, tables)
+
+
+def all_nodes(tree):
+    """
+    Returns every node of the tree, children before their parents.
+    Unlike postorder this includes the bodies of lookarounds
+    """
+    order = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(children(node))
+        if type(node) is Lookaround:
+            stack.append(node.node)
+    order.reverse()
+    return order
+
+
+class PatternStore:
+    """
+    A store file written by save_patterns, opened with a memory map.
+    Only the header and the index are read when it is opened, a pattern is decoded
+    from the map the first time it is asked for, without parsing its regex
+    """
+
+    def __init__(self, path) -> None:
+        self.path = path
+        with open(path, "rb") as store_file:
+            self.data = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            raise ValueError("{} is not a pattern store".format(path))
+        magic, version, marshal_version, self.max_repeat, index_length = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError("{} is not a pattern store".format(path))
+        if version != FORMAT_VERSION or marshal_version != marshal.version:
+            raise ValueError("{} has format version {}.{}, this version reads {}.{}".format(path, version, marshal_version, FORMAT_VERSION, marshal.version))
+        ranges, directory = marshal.loads(self.data[HEADER.size:(HEADER.size+index_length)])
+        self.charsets = [CharSet(charset_ranges) for charset_ranges in ranges]
+        self.universe = self.charsets[0]
+        # (offset, length) of every pattern record, by regex and uniform
+        records_start = HEADER.size + index_length
+        self.records = {(regex_string, uniform) : (records_start + offset, length) for regex_string, uniform, offset, length in directory}
+
+
+    def load(self, generator, regex_string, uniform=False, verifier=None):
+        """
+        Returns the CompiledPattern of the regex bound to the generator, or None if it is not in the store
+        """
+        record = self.records.get((regex_string, uniform))
+        if record is None:
+            return None
+        offset, length = record
+        encoded, counts, tables = marshal.loads(self.data[offset:(offset+length)])
+        charsets = self.charsets
+        nodes = []
+        for fields in encoded:
+            kind = fields[0]
+            if kind == LITERAL:
+                node = Literal(fields[1])
+            elif kind == CHAR_CLASS:
+                node = CharClass(charsets[fields[1]])
+            elif kind == SEQUENCE:
+                node = Sequence([nodes[index] for index in fields[1]])
+            elif kind == CHOICE:
+                node = Choice([nodes[index] for index in fields[1]])
+                node.cum_weights = fields[2]
+            elif kind == REPEAT:
+                node = Repeat(nodes[fields[1]], fields[2], fields[3])
+                node.cum_weights = fields[4]
+            elif kind == CAPTURE:
+                node = Capture(nodes[fields[1]], fields[2])
+            elif kind == BACKREFERENCE:
+                node = Backreference(fields[1])
+            elif kind == LOOKAROUND:
+                node = Lookaround(nodes[fields[1]], fields[2], fields[3], re.compile(fields[4]), re.compile(fields[5]))
+            else:
+                raise ValueError("unknown node kind {} in {}".format(kind, self.path))
+            nodes.append(node)
+        compiled = CompiledPattern(generator, regex_string, nodes[-1], False, verifier)
+        # the weights of a uniform pattern were stored on its nodes, they are not computed again
+        compiled.uniform = uniform
+        if counts is not None:
+            compiled.counts = {id(node) : count for node, count in zip(nodes, counts)}
+        if tables is not None:
+            compiled.tables = {id(node) : table for node, table in zip(nodes, tables) if table is not None}
+        return compiled
+
+
+    def close(self):
+        """
+        Closes the memory map, patterns loaded before stay usable
+        """
+        self.data.close()
+
+
+    def __contains__(self, key):
+        return key in self.records
+
+
+    def __len__(self):
+        return len(self.records)
@@ -602,8 +602,9 @@ class Generator:
             return regex_string
 
 
-test = Generator(100)
-print("From what regex would you like the string to be generated?")
-input = input()
-result = test.generate(input)
-print("The result is: {}".format(result))
\ No newline at end of file
+if __name__ == "__main__":
+    test = Generator(100)
+    print("From what regex would you like the string to be generated?")
+    regex_string = input()
+    result = test.generate(regex_string)
+    print("The result is: {}".format(result))
\ No newline at end of file
@@ -471,10 +471,11 @@ class Generator:
 # Second example fails
 #
 ####
-test = Generator(100)
-# print("The brackets of 'test\(yo(hoh(o)as\))' are:")
-# print(test.get_outer_brackets2('test\(yo(hoh(o)as\))'))
-print("From what regex would you like the string to be generated?")
-input = input()
-result = test.generate(input)
-print("The result is: {}".format(result))
\ No newline at end of file
+if __name__ == "__main__":
+    test = Generator(100)
+    # print("The brackets of 'test\(yo(hoh(o)as\))' are:")
+    # print(test.get_outer_brackets2('test\(yo(hoh(o)as\))'))
+    print("From what regex would you like the string to be generated?")
+    regex_string = input()
+    result = test.generate(regex_string)
+    print("The result is: {}".format(result))
\ No newline at end of file